@@ -1,12 +1,14 @@
 import os
 import shutil
 from datetime import datetime
-from groq import Groq
+from groqClient import get_groq_pool
+from rateLimiter import Priority
 import ast
 
 class AITeacher:
-    def __init__(self, api_key):
-        self.client = Groq(api_key="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")
+    def __init__(self, api_key, base_url=None):
+        self.groq_pool = get_groq_pool(api_key, base_url)
+        self.client = self.groq_pool.client
         # Fix Windows path format
         self.iterations_folder = "c:\\Pookie.AI\\MainFrame\\mainframeIterations"
         os.makedirs(self.iterations_folder, exist_ok=True)
@@ -38,7 +40,9 @@ class AITeacher:
                 return None
         """
         
-        response = self.client.chat.completions.create(
+        # Queued behind spoken replies so learning never delays the conversation
+        response = self.groq_pool.chat(
+            Priority.LEARNING,
             messages=[{"role": "user", "content": prompt}],
             model="deepseek-r1-distill-llama-70b"
         )
@@ -0,0 +1,182 @@
+import json
+import time
+import speech_recognition as sr
+
+
+class StreamingDecoder:
+    """Incremental decoder for one utterance; reports partial hypotheses as audio arrives"""
+    def __init__(self, on_partial=None):
+        self.on_partial = on_partial
+        self.last_partial = ""
+        self.words = []  # {"word", "start", "end"} timings in seconds from the first fed byte
+        self.stream_position = None  # Shared-stream offset of the first fed byte, set by the caller
+
+    def feed(self, chunk):
+        raise NotImplementedError
+
+    def finish(self):
+        """Return the final transcript (raises sr.UnknownValueError if nothing was heard)"""
+        raise NotImplementedError
+
+    def _emit_partial(self, text):
+        text = text.strip()
+        if text and text != self.last_partial:
+            self.last_partial = text
+            if self.on_partial:
+                self.on_partial(text)
+
+
+class ASRBackend:
+    """Speech-to-text engine used by SpeechHandler"""
+    name = "base"
+    streaming = False  # True if start_utterance() returns a StreamingDecoder
+
+    def recognize(self, audio):
+        """Transcribe a complete sr.AudioData phrase"""
+        raise NotImplementedError
+
+    def start_utterance(self, sample_rate, sample_width, on_partial=None):
+        return None
+
+
+class GoogleBackend(ASRBackend):
+    """The original cloud path through recognize_google"""
+    name = "google"
+
+    def __init__(self, recognizer=None, language="en-US"):
+        self.recognizer = recognizer or sr.Recognizer()
+        self.language = language
+
+    def recognize(self, audio):
+        return self.recognizer.recognize_google(audio, language=self.language)
+
+
+class VoskDecoder(StreamingDecoder):
+    def __init__(self, model, sample_rate, sample_width, on_partial=None):
+        super().__init__(on_partial)
+        from vosk import KaldiRecognizer
+        self.sample_width = sample_width
+        self.recognizer = KaldiRecognizer(model, sample_rate)
+        self.recognizer.SetWords(True)
+        self.segments = []  # Finalized text from internal endpoints inside the utterance
+
+    def feed(self, chunk):
+        if self.sample_width != 2:
+            chunk = sr.AudioData(chunk, 1, self.sample_width).get_raw_data(convert_width=2)
+        if self.recognizer.AcceptWaveform(bytes(chunk)):
+            self._collect(json.loads(self.recognizer.Result()))
+            self._emit_partial(" ".join(self.segments))
+        else:
+            partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+            self._emit_partial(" ".join(self.segments + [partial]))
+
+    def _collect(self, result):
+        if result.get("text"):
+            self.segments.append(result["text"])
+            self.words.extend(result.get("result", []))
+
+    def finish(self):
+        self._collect(json.loads(self.recognizer.FinalResult()))
+        text = " ".join(self.segments).strip()
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+class VoskBackend(ASRBackend):
+    """Offline Kaldi engine that decodes incrementally while the user is talking"""
+    name = "vosk"
+    streaming = True
+
+    def __init__(self, model_path="vosk-model-small-en-us"):
+        try:
+            from vosk import Model, SetLogLevel
+        except ImportError:
+            raise sr.RequestError("vosk is not installed; run `pip install vosk`")
+        SetLogLevel(-1)
+        self.model = Model(model_path)
+
+    def start_utterance(self, sample_rate, sample_width, on_partial=None):
+        return VoskDecoder(self.model, sample_rate, sample_width, on_partial)
+
+    def recognize(self, audio):
+        decoder = self.start_utterance(audio.sample_rate, audio.sample_width)
+        decoder.feed(audio.frame_data)
+        return decoder.finish()
+
+
+class FakeDecoder(StreamingDecoder):
+    def __init__(self, backend, bytes_per_word, on_partial=None):
+        super().__init__(on_partial)
+        self.backend = backend
+        self.bytes_per_word = bytes_per_word
+        self.bytes_fed = 0
+        self.transcript = backend.next_transcript()
+
+    def feed(self, chunk):
+        self.bytes_fed += len(chunk)
+        words = self.transcript.split()
+        heard = min(len(words), int(self.bytes_fed // self.bytes_per_word))
+        if heard:
+            self._emit_partial(" ".join(words[:heard]))
+
+    def finish(self):
+        if not self.transcript:
+            raise sr.UnknownValueError()
+        # Evenly spaced word timings at the scripted speaking rate
+        seconds_per_word = 1.0 / self.backend.words_per_second
+        self.words = [
+            {"word": word, "start": i * seconds_per_word, "end": (i + 1) * seconds_per_word}
+            for i, word in enumerate(self.transcript.split())
+        ]
+        return self.transcript
+
+
+class FakeBackend(ASRBackend):
+    """Deterministic scripted backend for tests and replay benchmarks"""
+    name = "fake"
+    streaming = True
+
+    def __init__(self, transcripts=None, words_per_second=3.0, latency=0.0):
+        self.transcripts = list(transcripts or [])
+        self.words_per_second = words_per_second
+        self.latency = latency  # Simulated decode delay for recognize()
+        self.index = 0
+        self.calls = 0
+
+    def next_transcript(self):
+        """Cycle through the scripted transcripts in order"""
+        if not self.transcripts:
+            return ""
+        transcript = self.transcripts[self.index % len(self.transcripts)]
+        self.index += 1
+        return transcript
+
+    def start_utterance(self, sample_rate, sample_width, on_partial=None):
+        bytes_per_word = sample_rate * sample_width / self.words_per_second
+        return FakeDecoder(self, bytes_per_word, on_partial)
+
+    def recognize(self, audio):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        transcript = self.next_transcript()
+        if not transcript:
+            raise sr.UnknownValueError()
+        return transcript
+
+
+BACKENDS = {
+    "google": GoogleBackend,
+    "vosk": VoskBackend,
+    "fake": FakeBackend,
+}
+
+
+def create_backend(name="google", **kwargs):
+    """Build a backend by name, e.g. create_backend("vosk", model_path=...)"""
+    if isinstance(name, ASRBackend):
+        return name
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown ASR backend: {name}")
+    return BACKENDS[name](**kwargs)
@@ -0,0 +1,82 @@
+import numpy as np
+import speech_recognition as sr
+from wakeWordSpotter import pcm_to_float
+
+
+def audio_duration(audio):
+    """Length of an sr.AudioData in seconds, using its real rate and width"""
+    return len(audio.frame_data) / float(audio.sample_rate * audio.sample_width)
+
+
+class AudioPreprocessor:
+    """Vectorized clean-up applied to a phrase before it is sent for recognition"""
+    def __init__(self, target_rate=16000, channels=1, trim_silence=True, normalize=True,
+                 silence_db=-35.0, keep_margin=0.1, target_peak=0.9, max_gain=8.0):
+        self.target_rate = target_rate
+        self.channels = channels        # Interleaved channels in the captured frame data
+        self.trim_silence = trim_silence
+        self.normalize = normalize
+        self.silence_db = silence_db    # Frames this far below the loudest frame are silence
+        self.keep_margin = keep_margin  # Seconds of context kept around the speech
+        self.target_peak = target_peak
+        self.max_gain = max_gain        # Don't blow up background hiss on quiet clips
+        self.frame_seconds = 0.02
+
+    def process(self, audio):
+        """Return a trimmed, 16 kHz mono, gain-normalized 16-bit sr.AudioData"""
+        samples = pcm_to_float(audio.frame_data, audio.sample_width)
+        samples = self.downmix(samples)
+        samples = self.resample(samples, audio.sample_rate)
+        if self.trim_silence:
+            samples = self.trim(samples)
+        if self.normalize:
+            samples = self.normalize_gain(samples)
+        pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+        return sr.AudioData(pcm, self.target_rate, 2)
+
+    def downmix(self, samples):
+        if self.channels <= 1:
+            return samples
+        usable = len(samples) - len(samples) % self.channels
+        return samples[:usable].reshape(-1, self.channels).mean(axis=1)
+
+    def resample(self, samples, rate):
+        if rate == self.target_rate or len(samples) == 0:
+            return samples
+        if rate > self.target_rate:
+            # Box filter as a cheap anti-alias before decimating
+            width = int(round(rate / self.target_rate))
+            if width > 1:
+                samples = np.convolve(samples, np.ones(width, dtype=np.float32) / width, mode="same")
+        target_length = int(len(samples) * self.target_rate / rate)
+        positions = np.arange(target_length) * (rate / float(self.target_rate))
+        return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+    def trim(self, samples):
+        """Cut leading and trailing silence, keeping a small margin"""
+        frame = int(self.target_rate * self.frame_seconds)
+        count = len(samples) // frame
+        if count == 0:
+            return samples
+        frames = samples[:count * frame].reshape(count, frame)
+        levels = 10 * np.log10(np.mean(frames * frames, axis=1) + 1e-12)
+        voiced = np.flatnonzero(levels > levels.max() + self.silence_db)
+        if len(voiced) == 0:
+            return samples[:0]
+        margin = int(self.keep_margin / self.frame_seconds)
+        start = max(0, voiced[0] - margin) * frame
+        end = min(count, voiced[-1] + 1 + margin) * frame
+        return samples[start:end]
+
+    def normalize_gain(self, samples):
+        if len(samples) == 0:
+            return samples
+        peak = float(np.max(np.abs(samples)))
+        if peak <= 0:
+            return samples
+        return samples * min(self.max_gain, self.target_peak / peak)
+
+    @staticmethod
+    def to_flac(audio):
+        """FLAC payload for upload paths that take encoded audio directly"""
+        return audio.get_flac_data(convert_width=2)
@@ -0,0 +1,279 @@
+import speech_recognition as sr
+import threading
+import time
+
+
+class AudioRingBuffer:
+    """Fixed-size byte ring that a single writer fills and many readers slice"""
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._data = bytearray(capacity)
+        self._view = memoryview(self._data)
+        self.write_pos = 0  # Total bytes ever written (monotonic)
+
+    def write(self, chunk):
+        """Copy a chunk into the ring without allocating intermediate bytes"""
+        chunk = memoryview(chunk)
+        size = len(chunk)
+        if size > self.capacity:  # Only the newest audio fits
+            chunk = chunk[size - self.capacity:]
+            self.write_pos += size - self.capacity
+            size = self.capacity
+
+        start = self.write_pos % self.capacity
+        first = min(size, self.capacity - start)
+        self._view[start:start + first] = chunk[:first]
+        if first < size:
+            self._view[:size - first] = chunk[first:]
+
+        # Publish only after the data is in place so readers never see a partial chunk
+        self.write_pos += size
+
+    def oldest_pos(self):
+        return max(0, self.write_pos - self.capacity)
+
+    def views(self, start, end):
+        """Return zero-copy memoryview slices covering [start, end)"""
+        start = max(start, self.oldest_pos())
+        end = min(end, self.write_pos)
+        if end <= start:
+            return []
+
+        begin = start % self.capacity
+        size = end - start
+        if begin + size <= self.capacity:
+            return [self._view[begin:begin + size]]
+        return [self._view[begin:], self._view[:begin + size - self.capacity]]
+
+    def read(self, start, end):
+        """Copy [start, end) out of the ring as bytes"""
+        return b"".join(self.views(start, end))
+
+
+class StreamReader(sr.AudioSource):
+    """Per-consumer cursor over the shared ring that looks like a microphone"""
+    def __init__(self, shared_stream, start_pos=None):
+        self.shared_stream = shared_stream
+        self.SAMPLE_RATE = shared_stream.sample_rate
+        self.SAMPLE_WIDTH = shared_stream.sample_width
+        self.CHUNK = shared_stream.chunk_size
+        self.position = shared_stream.buffer.write_pos if start_pos is None else start_pos
+        self.dropped_bytes = 0
+        self.tap = None  # Optional callable that sees every chunk this reader returns
+        self._scratch = bytearray()  # Reused by read_view() for chunks that wrap the ring
+        self.stream = self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _wait(self, frames, timeout):
+        """Wait for the next `frames` samples; returns their (start, end) in the ring or None"""
+        size = frames * self.SAMPLE_WIDTH
+        oldest = self.shared_stream.buffer.oldest_pos()
+        if self.position < oldest:  # Fell behind the writer - skip the overwritten audio
+            self.dropped_bytes += oldest - self.position
+            self.position = oldest
+
+        if not self.shared_stream.wait_for(self.position + size, timeout):
+            return None  # Stream stopped or timed out
+        return self.position, self.position + size
+
+    def _consumed(self, data):
+        self.position += len(data)
+        if self.shared_stream.lossless:
+            self.shared_stream.notify_consumed()
+        if self.tap:
+            self.tap(data)
+        return data
+
+    def read(self, frames, timeout=None):
+        """Block until `frames` samples are available, then return them (PyAudio semantics)"""
+        span = self._wait(frames, timeout)
+        if span is None:
+            return b""
+        return self._consumed(self.shared_stream.buffer.read(*span))
+
+    def read_view(self, frames, timeout=None):
+        """Like read(), but returns a memoryview into the ring instead of a bytes copy
+
+        Only valid until the next call: use it for consumers that analyse a
+        chunk and move on (noise floor, wake word spotter), not ones that keep
+        audio. A chunk that wraps around the ring end is gathered into a
+        reusable scratch buffer.
+        """
+        span = self._wait(frames, timeout)
+        if span is None:
+            return memoryview(b"")
+        views = self.shared_stream.buffer.views(*span)
+        if len(views) == 1:
+            return self._consumed(views[0])
+        size = sum(len(view) for view in views)
+        if len(self._scratch) < size:
+            self._scratch = bytearray(size)
+        scratch = memoryview(self._scratch)[:size]
+        scratch[:len(views[0])] = views[0]
+        scratch[len(views[0]):] = views[1]
+        return self._consumed(scratch)
+
+    def seek_to_live(self):
+        """Discard anything buffered and continue from the newest audio"""
+        self.position = self.shared_stream.buffer.write_pos
+
+    def rewind(self, seconds):
+        """Move the cursor back so recently captured audio is read again"""
+        bytes_back = int(seconds * self.SAMPLE_RATE) * self.SAMPLE_WIDTH
+        self.position = max(self.shared_stream.buffer.oldest_pos(), self.position - bytes_back)
+
+    def close(self):
+        self.shared_stream.release_reader(self)
+
+
+class SharedAudioStream:
+    """One long-lived microphone capture feeding every speech consumer"""
+    def __init__(self, device_index=None, sample_rate=None, chunk_size=1024, buffer_seconds=30,
+                 source_factory=None, lossless=False):
+        self.device_index = device_index
+        self.lossless = lossless  # Writer waits for the slowest reader instead of overwriting (replay)
+        self.source_factory = source_factory  # e.g. lambda: ReplaySource(path) instead of the mic
+        self.requested_rate = sample_rate
+        self.chunk_size = chunk_size
+        self.buffer_seconds = buffer_seconds
+
+        self.sample_rate = None
+        self.sample_width = None
+        self.buffer = None
+        self.readers = []
+        self.processors = []  # processor(chunk, sample_rate, sample_width) -> chunk, run before buffering
+        self.is_running = False
+        self.capture_thread = None
+        self.source = None
+        self._ready = threading.Event()
+        self._start_lock = threading.Lock()
+        self._data_ready = threading.Condition()
+        self.overruns = 0
+
+    def start(self):
+        """Open the device once and start the capture thread"""
+        with self._start_lock:
+            if not self.is_running:
+                self.is_running = True
+                self._ready.clear()
+                self.capture_thread = threading.Thread(target=self._capture_loop, daemon=True)
+                self.capture_thread.start()
+        self._ready.wait(timeout=5)
+
+    def _open_source(self):
+        if self.source_factory:
+            return self.source_factory()
+        return sr.Microphone(device_index=self.device_index,
+                             sample_rate=self.requested_rate,
+                             chunk_size=self.chunk_size)
+
+    def _capture_loop(self):
+        try:
+            with self._open_source() as source:
+                self.source = source
+                self.sample_rate = source.SAMPLE_RATE
+                self.sample_width = source.SAMPLE_WIDTH
+                self.chunk_size = source.CHUNK
+                capacity = int(self.sample_rate * self.buffer_seconds) * self.sample_width
+                self.buffer = AudioRingBuffer(capacity)
+                self._ready.set()
+
+                while self.is_running:
+                    try:
+                        chunk = source.stream.read(source.CHUNK)
+                    except OSError:
+                        self.overruns += 1  # Input overflow - keep the stream open
+                        continue
+                    if not chunk:
+                        break
+                    for processor in self.processors:
+                        chunk = processor(chunk, self.sample_rate, self.sample_width)
+                    if self.lossless and not self._wait_for_space(len(chunk)):
+                        break
+                    self.buffer.write(chunk)
+                    with self._data_ready:
+                        self._data_ready.notify_all()
+        except Exception as e:
+            print(f"Audio capture error: {e}")
+        finally:
+            self.is_running = False
+            self.source = None
+            self._ready.set()
+            with self._data_ready:
+                self._data_ready.notify_all()
+
+    def _wait_for_space(self, size):
+        """Backpressure for lossless mode: hold the writer until every reader can keep up"""
+        with self._data_ready:
+            while self.is_running:
+                if self.readers:
+                    slowest = min(reader.position for reader in self.readers)
+                    if self.buffer.write_pos + size - slowest <= self.buffer.capacity:
+                        return True
+                self._data_ready.wait(0.5)
+        return False
+
+    def wait_for(self, position, timeout=None):
+        """Wait until the writer has produced audio up to `position`"""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._data_ready:
+            while self.buffer.write_pos < position:
+                if not self.is_running:
+                    return False
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._data_ready.wait(remaining if remaining is not None else 0.5)
+        return True
+
+    def notify_consumed(self):
+        with self._data_ready:
+            self._data_ready.notify_all()
+
+    def add_processor(self, processor):
+        """Filter every captured chunk before any consumer sees it"""
+        self.processors.append(processor)
+
+    def open_reader(self, rewind_seconds=0.0):
+        """Create a new consumer cursor starting at the live edge"""
+        self.start()
+        if self.buffer is None:
+            raise RuntimeError("Audio capture stream is not available")
+        # Lossless streams start readers at the oldest audio so nothing is skipped
+        reader = StreamReader(self, self.buffer.oldest_pos() if self.lossless else None)
+        if rewind_seconds:
+            reader.rewind(rewind_seconds)
+        self.readers.append(reader)
+        return reader
+
+    def release_reader(self, reader):
+        if reader in self.readers:
+            self.readers.remove(reader)
+        if self.lossless:
+            self.notify_consumed()
+
+    def stop(self):
+        """Stop capture and close the device"""
+        self.is_running = False
+        with self._data_ready:
+            self._data_ready.notify_all()
+        if self.capture_thread:
+            self.capture_thread.join(timeout=1)
+
+
+_shared_stream = None
+_shared_stream_lock = threading.Lock()
+
+
+def get_shared_stream():
+    """Return the process-wide capture stream, creating it on first use"""
+    global _shared_stream
+    with _shared_stream_lock:
+        if _shared_stream is None:
+            _shared_stream = SharedAudioStream()
+        return _shared_stream
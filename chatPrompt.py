@@ -0,0 +1,54 @@
+import hashlib
+import json
+import threading
+
+SYSTEM_INSTRUCTIONS = (
+    "DO NOT USE EMOJIS. You are ThinkBot. Keep responses VERY SHORT - max 2 sentences. "
+    "Never refer to yourself as AI. Address user. "
+    "IMPORTANT: Be extremely concise. Don't explain or elaborate unless asked."
+)
+
+
+def serialize_messages(messages):
+    """Canonical bytes of a message list, as a provider would see the prefix"""
+    return json.dumps(messages, separators=(",", ":"), ensure_ascii=False, sort_keys=True).encode("utf-8")
+
+
+class PromptBuilder:
+    """Builds chat messages whose leading bytes are identical on every request
+
+    Layout: static system instructions, conversation history (append-only),
+    a tiny volatile segment with the emotion state, then the user's words.
+    Keeping the changing parts at the end lets the provider reuse its
+    cached prefix across turns.
+    """
+    def __init__(self, instructions=SYSTEM_INSTRUCTIONS):
+        self.system_message = {"role": "system", "content": instructions}
+        self.prefix_bytes = serialize_messages([self.system_message])
+        self.prefix_hash = hashlib.sha256(self.prefix_bytes).hexdigest()
+        self._state_messages = {}  # Emotion string -> memoized message
+        self._lock = threading.Lock()
+
+        # Counters
+        self.builds = 0
+        self.prefix_mismatches = 0  # Should stay 0; non-zero means the static prefix drifted
+
+    def state_message(self, emotion):
+        if emotion not in self._state_messages:
+            self._state_messages[emotion] = {"role": "system", "content": f"Current emotional state: {emotion}."}
+        return self._state_messages[emotion]
+
+    def build(self, user_input, history=(), emotion=None):
+        messages = [self.system_message] + list(history)
+        if emotion:
+            messages.append(self.state_message(emotion))
+        messages.append({"role": "user", "content": user_input})
+        with self._lock:
+            self.builds += 1
+            if not self.verify_prefix(messages):
+                self.prefix_mismatches += 1
+        return messages
+
+    def verify_prefix(self, messages):
+        """True if `messages` starts with the exact memoized prefix bytes"""
+        return hashlib.sha256(serialize_messages(messages[:1])).hexdigest() == self.prefix_hash
@@ -0,0 +1,150 @@
+import collections
+import hashlib
+import math
+import re
+import threading
+
+# Word pieces, numbers and individual punctuation marks - roughly how BPE splits English
+_TOKEN_PATTERN = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+
+def estimate_tokens(text):
+    """Approximate LLM token count without a tokenizer download
+
+    Long words cost one token per ~4 characters, like a BPE vocabulary.
+    """
+    return sum(max(1, math.ceil(len(piece) / 4.0)) for piece in _TOKEN_PATTERN.findall(text))
+
+
+def truncate_to_tokens(text, max_tokens, keep_end=False):
+    words = text.split()
+    while words and estimate_tokens(" ".join(words)) > max_tokens:
+        words.pop(0 if keep_end else -1)
+    return " ".join(words)
+
+
+# Words that point back at something said earlier ("how old is he", "tell me more")
+FOLLOW_UP_WORDS = {
+    "it", "its", "it's", "he", "she", "him", "her", "his", "hers", "they", "them", "their", "theirs",
+    "that", "this", "those", "these", "there", "more", "else", "another", "also", "too", "instead",
+    "same", "one", "ones", "again", "previous", "earlier", "above",
+}
+
+
+def is_follow_up(text):
+    """Does the question lean on the previous exchange?"""
+    words = re.findall(r"[a-z']+", text.lower())
+    return any(word in FOLLOW_UP_WORDS for word in words)
+
+
+def first_sentence(text):
+    match = re.match(r"(.+?[.!?])(\s|$)", text.strip())
+    return match.group(1) if match else text.strip()
+
+
+def extractive_summary(previous_summary, turns, max_tokens):
+    """Fold old turns into the running summary: one short line per exchange"""
+    lines = [previous_summary] if previous_summary else []
+    for role, content in turns:
+        speaker = "User" if role == "user" else "You"
+        lines.append(f"{speaker}: {first_sentence(content)}")
+    summary = " ".join(lines)
+    # Keep the newest facts when it overflows
+    while estimate_tokens(summary) > max_tokens and len(lines) > 1:
+        lines.pop(0)
+        summary = " ".join(lines)
+    return truncate_to_tokens(summary, max_tokens, keep_end=True)
+
+
+class ConversationContext:
+    """Recent conversation turns kept under a token budget
+
+    When the history outgrows the budget the oldest turns are folded into a
+    running summary, a few turns at a time. Summaries are cached by their
+    inputs, so rebuilding the same context never re-summarizes.
+    """
+    def __init__(self, max_tokens=400, summary_tokens=80, min_recent_turns=2, summarizer=None,
+                 summary_cache_size=8):
+        self.max_tokens = max_tokens            # Budget for summary + recent turns
+        self.summary_tokens = summary_tokens
+        self.min_recent_turns = min_recent_turns  # Exchanges that are never folded away
+        self.summarizer = summarizer or extractive_summary  # fn(previous, [(role, text)], max_tokens)
+        self.turns = []    # [(role, content, tokens)]
+        self.summary = ""
+        self.summary_cache = collections.OrderedDict()  # Small LRU; only recent rebuilds repeat
+        self.summary_cache_size = summary_cache_size
+        self._lock = threading.Lock()
+
+        # Counters
+        self.summaries_built = 0
+        self.summary_cache_hits = 0
+
+    @property
+    def token_count(self):
+        return estimate_tokens(self.summary) + sum(turn[2] for turn in self.turns)
+
+    def add_turn(self, user_text, assistant_text):
+        with self._lock:
+            self.turns.append(("user", user_text, estimate_tokens(user_text)))
+            if assistant_text:
+                self.turns.append(("assistant", assistant_text, estimate_tokens(assistant_text)))
+            self._enforce_budget()
+
+    def _enforce_budget(self):
+        while self.token_count > self.max_tokens and len(self.turns) > self.min_recent_turns * 2:
+            # Fold the oldest exchange (user + assistant)
+            folded = self.turns[:2]
+            self.turns = self.turns[2:]
+            self.summary = self._summarize(self.summary, [(role, text) for role, text, _ in folded])
+        # Recent turns beat old summary when both don't fit
+        if self.token_count > self.max_tokens and self.summary:
+            recent = sum(turn[2] for turn in self.turns)
+            self.summary = truncate_to_tokens(self.summary, max(0, self.max_tokens - recent), keep_end=True)
+        # A single huge turn can still blow the budget - drop from the front
+        while self.token_count > self.max_tokens and len(self.turns) > 1:
+            self.turns.pop(0)
+
+    def _summarize(self, previous, turns):
+        key = hashlib.sha1(repr((previous, turns)).encode("utf-8")).hexdigest()
+        if key in self.summary_cache:
+            self.summary_cache_hits += 1
+            self.summary_cache.move_to_end(key)
+            return self.summary_cache[key]
+        summary = self.summarizer(previous, turns, self.summary_tokens)
+        self.summary_cache[key] = summary
+        while len(self.summary_cache) > self.summary_cache_size:
+            self.summary_cache.popitem(last=False)
+        self.summaries_built += 1
+        return summary
+
+    def messages(self):
+        """History as chat messages, oldest first"""
+        with self._lock:
+            history = []
+            if self.summary:
+                history.append({"role": "system", "content": f"Earlier in this conversation: {self.summary}"})
+            history.extend({"role": role, "content": content} for role, content, _ in self.turns)
+            return history
+
+    def fingerprint(self):
+        """Stable hash of the current context, for cache keys"""
+        with self._lock:
+            raw = repr((self.summary, [(role, content) for role, content, _ in self.turns]))
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+    def cache_scope(self, text):
+        """Cache key part for a reply to `text`
+
+        Context-free questions share one scope for the whole session, so asking
+        again hits the cache. Follow-ups are scoped by the last exchange only.
+        """
+        with self._lock:
+            last = [(role, content) for role, content, _ in self.turns[-2:]]
+        if not last or not is_follow_up(text):
+            return ""
+        return hashlib.sha1(repr(last).encode("utf-8")).hexdigest()[:16]
+
+    def clear(self):
+        with self._lock:
+            self.turns = []
+            self.summary = ""
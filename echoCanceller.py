@@ -0,0 +1,171 @@
+import difflib
+import threading
+import time
+import numpy as np
+from responseCache import normalize_text
+from wakeWordSpotter import pcm_to_float
+
+
+def transcript_is_echo(transcript, spoken, min_words=3, min_overlap=0.7):
+    """Is `transcript` just the recognizer hearing `spoken` (our own TTS) leak back in?
+
+    Short transcripts only count when they are the whole spoken text, so a
+    user's "stop" over a sentence containing "stop" still barges in.
+    """
+    heard, said = normalize_text(transcript).split(), normalize_text(spoken).split()
+    if not heard or not said:
+        return False
+    if len(heard) < min_words:
+        return heard == said
+    matcher = difflib.SequenceMatcher(None, said, heard, autojunk=False)
+    matched = sum(block.size for block in matcher.get_matching_blocks())
+    return matched >= min_overlap * len(heard)
+
+
+class EchoCanceller:
+    """Removes the bot's own TTS output from the microphone signal
+
+    The TTS waveform is registered as a reference when playback starts. Each
+    captured chunk is aligned with the reference (delay found by
+    cross-correlation), passed through a block NLMS filter, and then gated:
+    chunks that still correlate with the reference are attenuated, chunks
+    that don't (the user talking over the bot) pass through untouched.
+    Until the delay has locked nothing can be subtracted yet, so those chunks
+    are attenuated too rather than leaking raw echo to the recognizer.
+    """
+    def __init__(self, filter_length=256, step_size=0.3, block_size=64, max_delay=0.3,
+                 echo_correlation=0.4, suppression=0.05, tail=0.3):
+        self.filter_length = filter_length
+        self.step_size = step_size
+        self.block_size = block_size
+        self.max_delay = max_delay                # Longest output-to-mic delay searched (s)
+        self.echo_correlation = echo_correlation  # Above this the chunk is treated as echo
+        self.suppression = suppression            # Gain applied to echo-only chunks
+        self.tail = tail                          # Keep cancelling this long after playback ends (s)
+
+        self.weights = np.zeros(filter_length, dtype=np.float32)
+        self.reference = None
+        self.reference_rate = None
+        self.resampled = {}
+        self.start_time = 0.0
+        self.end_time = 0.0
+        self.delay = None
+        self._lock = threading.Lock()
+
+        # Counters
+        self.chunks_gated = 0
+        self.chunks_passed = 0
+
+    def start_reference(self, samples, sample_rate, start_time=None):
+        """Register the waveform that is about to be played"""
+        with self._lock:
+            self.reference = np.asarray(samples, dtype=np.float32)
+            self.reference_rate = sample_rate
+            self.resampled = {}
+            self.start_time = time.time() if start_time is None else start_time
+            self.end_time = self.start_time + len(self.reference) / float(sample_rate)
+            self.delay = None
+
+    def stop_reference(self):
+        """Playback was cut short (barge-in)"""
+        with self._lock:
+            self.end_time = min(self.end_time, time.time())
+
+    @property
+    def is_active(self):
+        return self.reference is not None and time.time() < self.end_time + self.tail
+
+    def _reference_at(self, rate):
+        if rate not in self.resampled:
+            if rate == self.reference_rate:
+                self.resampled[rate] = self.reference
+            else:
+                length = int(len(self.reference) * rate / self.reference_rate)
+                positions = np.arange(length) * (self.reference_rate / float(rate))
+                self.resampled[rate] = np.interp(
+                    positions, np.arange(len(self.reference)), self.reference
+                ).astype(np.float32)
+        return self.resampled[rate]
+
+    def _segment(self, reference, start, length):
+        """Reference samples [start, start + length), zero-padded outside playback"""
+        segment = np.zeros(length, dtype=np.float32)
+        lo, hi = max(0, start), min(len(reference), start + length)
+        if hi > lo:
+            segment[lo - start:hi - start] = reference[lo:hi]
+        return segment
+
+    def _estimate_delay(self, mic, reference, position, rate):
+        """Find the acoustic + device delay by cross-correlating mic with reference"""
+        max_lag = int(self.max_delay * rate)
+        window = self._segment(reference, position - max_lag, len(mic) + max_lag)
+        if np.dot(window, window) < 1e-6 or np.dot(mic, mic) < 1e-6:
+            return None
+        correlation = np.correlate(window, mic, mode="valid")  # Index i <=> lag max_lag - i
+        best = int(np.argmax(np.abs(correlation)))
+        aligned = window[best:best + len(mic)]
+        score = abs(correlation[best]) / (np.linalg.norm(aligned) * np.linalg.norm(mic) + 1e-9)
+        if score < self.echo_correlation:
+            return None
+        return max_lag - best
+
+    def process(self, chunk, sample_rate, sample_width=2):
+        """Filter one captured chunk; returns PCM bytes of the same format"""
+        if not self.is_active:
+            return chunk
+
+        with self._lock:
+            mic = pcm_to_float(chunk, sample_width)
+            reference = self._reference_at(sample_rate)
+            # The chunk just finished arriving, so it started len(mic) samples ago
+            position = int((time.time() - self.start_time) * sample_rate) - len(mic)
+
+            if self.delay is None:
+                self.delay = self._estimate_delay(mic, reference, position, sample_rate)
+                if self.delay is None:
+                    # Not enough echo yet to lock on; don't let it reach the recognizer raw
+                    self.chunks_gated += 1
+                    return self._to_pcm(mic * self.suppression, chunk, sample_width)
+
+            history = self._segment(reference, position - self.delay - self.filter_length + 1,
+                                    len(mic) + self.filter_length - 1)
+            aligned = history[self.filter_length - 1:]
+
+            # Low correlation with loud mic means the user is talking - freeze adaptation
+            correlation = abs(np.dot(mic, aligned)) / (np.linalg.norm(mic) * np.linalg.norm(aligned) + 1e-9)
+            is_echo = correlation > self.echo_correlation
+            residual = self._nlms(mic, history, adapt=is_echo)
+
+            # Correlation gate: a chunk that is mostly our own voice is suppressed
+            if is_echo:
+                residual *= self.suppression
+                self.chunks_gated += 1
+            else:
+                self.chunks_passed += 1
+
+        return self._to_pcm(residual, chunk, sample_width)
+
+    def _to_pcm(self, samples, chunk, sample_width):
+        if sample_width == 2:
+            return (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+        return chunk
+
+    def _nlms(self, mic, history, adapt=True):
+        """Block NLMS: predict the echo from the reference and subtract it"""
+        taps = np.lib.stride_tricks.sliding_window_view(history, self.filter_length)
+        residual = np.empty_like(mic)
+        for start in range(0, len(mic), self.block_size):
+            block = taps[start:start + self.block_size]
+            target = mic[start:start + self.block_size]
+            error = target - block @ self.weights
+            residual[start:start + len(error)] = error
+            if not adapt:
+                continue
+            power = float(np.sum(block * block)) + 1e-6
+            self.weights += (self.step_size / power) * (block.T @ error)
+        return residual
+
+    def reset(self):
+        with self._lock:
+            self.weights[:] = 0
+            self.delay = None
@@ -0,0 +1,163 @@
+import collections
+import math
+import time
+import speech_recognition as sr
+from noiseFloor import NoiseFloorEstimator
+
+
+class EndpointDecision:
+    def __init__(self, silence_window, waited, speech_duration, speaking_rate, trend, reason):
+        self.silence_window = silence_window    # Silence required for this utterance (s)
+        self.waited = waited                    # Silence actually waited before deciding (s)
+        self.speech_duration = speech_duration  # Voiced audio in the utterance (s)
+        self.speaking_rate = speaking_rate      # Energy peaks per second, a syllable-rate proxy
+        self.trend = trend                      # Log-energy slope at the end of speech (per s)
+        self.reason = reason                    # "silence" or "limit"
+        self.decided_at = time.time()
+
+    def __repr__(self):
+        return (f"EndpointDecision(window={self.silence_window:.2f}s, waited={self.waited:.2f}s, "
+                f"speech={self.speech_duration:.2f}s, rate={self.speaking_rate:.1f}/s, reason={self.reason})")
+
+
+class AdaptiveEndpointer:
+    """End-of-utterance detection with a silence window that adapts per utterance
+
+    Short commands that trail off ("stop", "next") are cut after a short pause;
+    long or still-rising utterances get a longer window so mid-sentence pauses
+    don't split them. Drop-in replacement for sr.Recognizer.listen().
+    """
+    def __init__(self, min_silence=0.25, max_silence=1.0, pre_roll=0.3, min_phrase=0.15):
+        self.energy_threshold = 1000       # Updated by NoiseFloorEstimator.attach()
+        self.dynamic_energy_threshold = False
+        self.min_silence = min_silence     # Window for short, falling commands
+        self.max_silence = max_silence     # Window for long utterances mid-thought
+        self.pre_roll = pre_roll           # Audio kept from before speech started
+        self.min_phrase = min_phrase       # Voiced time needed to count as a phrase
+        self.trailing_keep = 0.2           # Trailing silence kept in the returned audio
+        self.reference_rate = 4.0          # Typical energy peaks per second of speech
+        self.last_decision = None
+        self.decisions = collections.deque(maxlen=50)
+
+    def silence_window(self, speech_duration, speaking_rate, trend, longest_pause):
+        """How much silence ends this utterance"""
+        # Longer utterances are more likely to be mid-sentence
+        length_factor = min(1.0, speech_duration / 2.5)
+        # Energy that was still steady or rising when speech stopped suggests more is coming
+        trend_factor = 0.0 if trend < -8.0 else (0.5 if trend < 0 else 1.0)
+        openness = 0.6 * length_factor + 0.4 * trend_factor
+        window = self.min_silence + (self.max_silence - self.min_silence) * openness
+
+        # Slow speakers leave longer gaps between words
+        if speaking_rate > 0:
+            window *= min(1.5, max(0.75, self.reference_rate / speaking_rate))
+
+        # Never cut shorter than a pause the user already made inside this utterance
+        window = max(window, min(self.max_silence, longest_pause * 1.2))
+        return min(self.max_silence * 1.5, max(self.min_silence, window))
+
+    def capture(self, source, timeout=None, phrase_time_limit=None):
+        """Record one phrase from `source` and return it as sr.AudioData"""
+        chunk_seconds = float(source.CHUNK) / source.SAMPLE_RATE
+        pre_roll = collections.deque(maxlen=max(1, int(math.ceil(self.pre_roll / chunk_seconds))))
+        elapsed = 0.0
+
+        while True:
+            # Wait for speech to start
+            while True:
+                elapsed += chunk_seconds
+                if timeout and elapsed > timeout:
+                    raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+                chunk = source.stream.read(source.CHUNK)
+                if len(chunk) == 0:
+                    return sr.AudioData(b"".join(pre_roll), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+                energy = NoiseFloorEstimator.frame_energy(chunk, source.SAMPLE_WIDTH)
+                if energy > self.energy_threshold:
+                    break
+                pre_roll.append(chunk)
+
+            frames = list(pre_roll) + [chunk]
+            pre_roll.clear()
+            result = self._capture_phrase(source, frames, energy, chunk_seconds, phrase_time_limit)
+            if result is not None:
+                return result
+
+    def _capture_phrase(self, source, frames, first_energy, chunk_seconds, phrase_time_limit):
+        speech_time = chunk_seconds
+        silence_time = 0.0
+        phrase_time = 0.0
+        longest_pause = 0.0
+        peaks = 0
+        log_energies = collections.deque([math.log(first_energy + 1.0)], maxlen=max(2, int(0.25 / chunk_seconds)))
+        smoothed = first_energy
+        rising = True
+        trend = 0.0
+        decision = None
+
+        while True:
+            chunk = source.stream.read(source.CHUNK)
+            if len(chunk) == 0:
+                break
+            frames.append(chunk)
+            phrase_time += chunk_seconds
+            energy = NoiseFloorEstimator.frame_energy(chunk, source.SAMPLE_WIDTH)
+            threshold = self.energy_threshold
+
+            if energy > threshold:
+                if silence_time > 0:
+                    longest_pause = max(longest_pause, silence_time)
+                silence_time = 0.0
+                speech_time += chunk_seconds
+
+                # Count syllable-like peaks in the smoothed envelope for a speaking-rate estimate
+                previous = smoothed
+                smoothed = 0.6 * smoothed + 0.4 * energy
+                if rising and smoothed < previous * 0.9:
+                    peaks += 1
+                    rising = False
+                elif not rising and smoothed > previous * 1.1:
+                    rising = True
+
+                log_energies.append(math.log(energy + 1.0))
+                if len(log_energies) > 1:
+                    trend = (log_energies[-1] - log_energies[0]) / ((len(log_energies) - 1) * chunk_seconds)
+            else:
+                silence_time += chunk_seconds
+                speaking_rate = peaks / speech_time if speech_time else 0.0
+                window = self.silence_window(speech_time, speaking_rate, trend, longest_pause)
+                if silence_time >= window:
+                    decision = (window, silence_time, speech_time, speaking_rate, trend, "silence")
+                    break
+
+            if phrase_time_limit and phrase_time >= phrase_time_limit:
+                speaking_rate = peaks / speech_time if speech_time else 0.0
+                decision = (0.0, silence_time, speech_time, speaking_rate, trend, "limit")
+                break
+
+        if speech_time < self.min_phrase:
+            return None  # Click or bump, keep waiting
+        if decision:
+            self._record(*decision)
+
+        # Where the phrase starts in the shared stream, so it can be matched to wake detections
+        start_position = getattr(source, "position", None)
+        if start_position is not None:
+            start_position -= sum(len(frame) for frame in frames)
+
+        # Keep only a short tail of the trailing silence
+        trailing_chunks = int(silence_time / chunk_seconds) - int(math.ceil(self.trailing_keep / chunk_seconds))
+        if trailing_chunks > 0:
+            frames = frames[:-trailing_chunks]
+        audio = sr.AudioData(b"".join(frames), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+        audio.stream_position = start_position
+        return audio
+
+    def _record(self, window, waited, speech_duration, speaking_rate, trend, reason):
+        self.last_decision = EndpointDecision(window, waited, speech_duration, speaking_rate, trend, reason)
+        self.decisions.append(self.last_decision)
+
+    def average_wait(self):
+        """Mean silence waited per utterance - the endpointing share of turn latency"""
+        if not self.decisions:
+            return 0.0
+        return sum(d.waited for d in self.decisions) / len(self.decisions)
@@ -1,7 +1,8 @@
 import os
 import pyttsx3
 import speech_recognition as sr
-from groq import Groq
+from groqClient import get_groq_pool
+from rateLimiter import Priority
 import logging
 from botBase import BotStatus
 from emotionSynthesizer import EmotionSynthesizer
@@ -13,13 +14,37 @@ from aiLearningSupervisor import *
 from aiTeachingScript import AITeacher
 from speechHandler import *
 from timerHandler import *
+from audioStream import get_shared_stream
+from wakeWordSpotter import WakeWordSpotter, contains_wake_phrase, split_wake_phrase
+from noiseFloor import NoiseFloorEstimator
+from endpointer import AdaptiveEndpointer
+from echoCanceller import EchoCanceller
+from ttsPlayback import TTSPlayer
+from sessionRecorder import SessionRecorder
+from responseStreamer import SpeechPipeline, stream_sentences, ends_with_abbreviation, first_complete_sentence
+from responseCache import ResponseCache, normalize_text
+from semanticCache import SemanticCache
+from intentRouter import (IntentRouter, whole_utterance, TIME_REQUESTS, DATE_REQUESTS, STATUS_REQUESTS,
+                          IDENTITY_REQUESTS)
+from conversationContext import ConversationContext
+from requestHedger import HedgedCaller, DeadlineExceeded
+from chatPrompt import PromptBuilder
+from speculativeResponder import SpeculativeResponder
+from modelRouter import ModelRouter, ModelTier, EASY_INTENTS
+from utteranceCoalescer import UtteranceCoalescer
+from stepGuide import (step_list_messages, parse_step_list, describe_step,
+                       NEXT_PHRASES, BACK_PHRASES, REPEAT_PHRASES, STOP_PHRASES)
+from datetime import datetime
 
 
 class ThinkBot:
-    def __init__(self, api_key):
+    def __init__(self, api_key, asr_backend=None, audio_stream=None, response_cache_path=None,
+                 groq_base_url=None):
         print("Initializing ThinkBot...")
         self.base_voice_rate = 175  # Move this to top of init
-        self.client = Groq(api_key=api_key)
+        # Keep-alive connections shared with AITeacher; groq_base_url/GROQ_BASE_URL can point at mockGroqServer
+        self.groq_pool = get_groq_pool(api_key, groq_base_url)
+        self.client = self.groq_pool.client
         self.speech_lock = threading.Lock()  # Add lock for speech synchronization
         self.engine = pyttsx3.init()
         self.setup_voice()  # Call setup_voice after setting base_voice_rate
@@ -42,9 +67,7 @@ class ThinkBot:
             'right', 'good', 'go', 'next', 'proceed', 'carry on', 'yep', 
             'move on', 'ready'
         ]
-        self.recognizer.pause_threshold = 0.5  # Increased from 0.3
-        self.recognizer.phrase_threshold = 0.3
-        self.recognizer.non_speaking_duration = 0.4  # Increased from 0.3
+        self.endpointer = AdaptiveEndpointer(max_silence=0.5, pre_roll=0.4, min_phrase=0.3)
         self.operation_timeout = None  # Remove timeout restriction
         self.previous_command = None
         self.awaiting_step_confirmation = False
@@ -81,7 +104,18 @@ class ThinkBot:
         self.max_consecutive_wakes = 3
         self.last_spontaneous_time = time.time()
         self.eye_tracker = None  # Will be set from main.py
-        self.speech_handler = SpeechHandler()
+        self.audio_stream = audio_stream or get_shared_stream()  # One capture stream for wake word and commands
+        self.session_recorder = None
+        self.echo_canceller = EchoCanceller()  # Subtracts our own TTS from the mic
+        self.audio_stream.add_processor(self.echo_canceller.process)
+        self.tts_player = TTSPlayer(self.echo_canceller)
+        self.noise_estimator = NoiseFloorEstimator(self.audio_stream)  # Shared by every listener
+        self.noise_estimator.attach(self.endpointer)
+        self.speech_handler = SpeechHandler(self.audio_stream, backend=asr_backend,
+                                            noise_estimator=self.noise_estimator)
+        self.wake_phrases = ["hey bot", "hey", "hello", "hi", "hey think", "okay bot"]
+        self.wake_spotter = WakeWordSpotter()  # Local keyword spotting, falls back to text matching
+        self.speech_handler.recognition_gate = self.should_recognize
         self.last_command_time = 0
         self.command_cooldown = 0.5  # 500ms cooldown between commands
         self.last_wake_time = 0
@@ -102,6 +136,45 @@ class ThinkBot:
         self.last_response_time = 0
         self.response_cooldown = 1.0  # 1 second between responses
         self.speak_cooldown = 0.5  # Time to wait after speaking
+        self.chat_model = "llama3-8b-8192"
+        self.max_response_tokens = 50  # Limit response length
+        # Smaller budgets for intents that never need many words
+        self.intent_max_tokens = {"greeting": 25, "confirm": 20, "identity": 30}
+        # Server stops at the first sentence end; the stop text itself isn't returned
+        self.sentence_stops = [". ", "! ", "? ", "\n"]
+        # Cheap local complexity score picks the model and token budget per question
+        self.model_router = ModelRouter([
+            ModelTier("small", "llama-3.1-8b-instant", 40, max_score=0.25),
+            ModelTier("default", self.chat_model, self.max_response_tokens, max_score=0.6),
+            ModelTier("large", "llama-3.3-70b-versatile", 120, max_score=1.0),
+        ])
+        self.stream_responses = True  # Speak each sentence as soon as it has been generated
+        self.speech_pipeline = None
+        self.response_cache = ResponseCache(persist_path=response_cache_path)
+        self.semantic_cache = SemanticCache()  # Catches reworded repeats the exact cache misses
+        self.time_sensitive_words = ['time', 'today', 'now', 'date', 'weather', 'timer', 'news', 'latest']
+        self.goodbye_phrases = ["goodbye", "bye", "good night", "see you later"]
+        self.intent_router = self._build_intent_router()
+        self.conversation = ConversationContext(max_tokens=400)  # Recent turns so follow-ups make sense
+        self.hedger = HedgedCaller()  # Per-model latency stats pick when to send a backup request
+        self.hedge_model = "llama-3.1-8b-instant"  # Backup for slow requests; None hedges with chat_model
+        self.response_deadline = 6.0  # Seconds before giving up and using the fallback answer
+        self.fallback_answer = "Sorry, I'm thinking a bit slowly right now. Please ask me again."
+        self.prompt_builder = PromptBuilder()  # Byte-stable system prefix the provider can cache
+        self.max_step_tokens = 600  # Room for a whole step list in one reply
+        self.step_list_deadline = 12.0
+        # Start the LLM on a stable partial transcript (streaming ASR backends only).
+        # Background priority, so misses don't eat the interactive rate-limit reserve
+        self.speculator = SpeculativeResponder(
+            lambda text: self._stream_sentences(text, Priority.BACKGROUND),
+            should_speculate=self._speculation_text
+        )
+        self.speech_handler.partial_callback = self.speculator.on_partial
+        # Fragments split by a mid-sentence pause become one request
+        self.coalescer = UtteranceCoalescer(self.handle_speech, cancel=self.cancel_reply)
+        self.speech_handler.coalesced = True  # Split fragments must reach the coalescer, not a cooldown
+        self.reply_generation = 0  # Bumped to abandon the reply in progress
+        logging.info(f"System prompt prefix {self.prompt_builder.prefix_hash[:12]}")
 
     def setup_voice(self):
         """Configure voice settings for more natural speech"""
@@ -159,6 +232,20 @@ class ThinkBot:
     def _update_status(self, new_status: BotStatus):
         self._status = new_status
         logging.info(f"Status: {self._status.value}")
+        if new_status == BotStatus.WAKE_DETECTED:
+            self.groq_pool.warm_up()  # Handshake while the user is still talking
+        if self.session_recorder:
+            self.session_recorder.record_event("status", value=new_status.value)
+
+    def record_session(self, path):
+        """Record raw mic audio and bot events to `path` for later replay"""
+        self.session_recorder = SessionRecorder(path, self.audio_stream)
+        self.session_recorder.start()
+
+    def stop_recording(self):
+        if self.session_recorder:
+            self.session_recorder.stop()
+            self.session_recorder = None
 
     def set_voice(self, gender):
         voices = self.engine.getProperty('voices')
@@ -167,28 +254,391 @@ class ThinkBot:
         else:
             self.engine.setProperty('voice', voices[1].id)
 
+    def _chat_messages(self, user_input):
+        return self.prompt_builder.build(
+            user_input,
+            history=self.conversation.messages(),
+            emotion=self.emotion_synth.get_current_emotion_str()
+        )
+
+    def _cache_context(self, user_input):
+        # Follow-ups ("how old is he") mean something else after a different exchange
+        return f"{self.emotion_synth.get_current_emotion_str()}|{self.conversation.cache_scope(user_input)}"
+
+    def _cache_key(self, user_input, context=None):
+        context = self._cache_context(user_input) if context is None else context
+        return self.response_cache.make_key(user_input, self.chat_model, context)
+
+    def _semantic_lookup(self, user_input, context):
+        match = self.semantic_cache.lookup(user_input, f"{self.chat_model}|{context}")
+        if match is None:
+            return None
+        response, similarity, original = match
+        logging.info(f"Semantic cache hit ({similarity:.2f}): '{user_input}' ~ '{original}'")
+        return response
+
+    def _remember_response(self, user_input, response, context):
+        ttl = self._response_ttl(user_input)
+        self.semantic_cache.put(user_input, response, f"{self.chat_model}|{context}", ttl=ttl)
+        return ttl
+
+    def _response_ttl(self, user_input):
+        """Seconds a reply stays valid; 0 means never cache it"""
+        words = normalize_text(user_input).split()
+        if any(word in words for word in self.time_sensitive_words):
+            return 0
+        if len(words) <= 3:  # Greetings and "who are you" style small talk
+            return 3600
+        return self.response_cache.default_ttl
+
     def get_chat_response(self, user_input):
         self._update_status(BotStatus.PROCESSING_COMMAND)
+        context = self._cache_context(user_input)
+        response = self._semantic_lookup(user_input, context)
+        if response:
+            return response
+        try:
+            response, cached = self.response_cache.get_or_compute(
+                self._cache_key(user_input, context),
+                lambda: self._request_chat_response(user_input),
+                ttl=self._response_ttl(user_input)
+            )
+        except DeadlineExceeded:
+            logging.warning("Chat response missed its deadline, using fallback")
+            return self.fallback_answer
+        if cached:
+            logging.info("Response cache hit")
+        else:
+            self._remember_response(user_input, response, context)
+        return response
 
-        # Add max token limit and conciseness to prompt
-        custom_prompt = (
-            "DO NOT USE EMOJIS. You are ThinkBot. Keep responses VERY SHORT - max 2 sentences. "
-            "Never refer to yourself as AI. Address user. "
-            f"Current emotional state: {self.emotion_synth.get_current_emotion_str()}. "
-            "IMPORTANT: Be extremely concise. Don't explain or elaborate unless asked."
-        )
+    def _hedged_attempts(self, request, label="", model=None):
+        """Primary request on `model` (chat_model by default), backup on hedge_model"""
+        model = model or self.chat_model
+        models = [model, self.hedge_model or model]
+        return [(f"{model}{label}", lambda model=model: request(model)) for model in models]
 
-        chat_completion = self.client.chat.completions.create(
-            messages=[{"role": "user", "content": custom_prompt + user_input}],
-            model="llama3-8b-8192",
-            max_tokens=50  # Limit response length
-        )
-        
-        response = chat_completion.choices[0].message.content
-        # Clean up response to be more concise
-        response = response.split(".")[0].strip() + "."  # Keep only first sentence
+    def _request_chat_response(self, user_input):
+        messages = self._chat_messages(user_input)
+        decision = self._route_model(user_input)
+        max_tokens = self._max_tokens_for(user_input, decision.max_tokens)
+        started = time.time()
+
+        def request(model, stop=self.sentence_stops):
+            return self.groq_pool.chat(
+                Priority.INTERACTIVE,
+                messages=messages,
+                model=model,
+                max_tokens=max_tokens,
+                stop=stop
+            )
+
+        # Only the first sentence is spoken, so stop generating there
+        chat_completion = self.hedger.call(self._hedged_attempts(request, model=decision.model),
+                                           self.response_deadline)
+        self.model_router.record_latency(decision, time.time() - started)
+        choice = chat_completion.choices[0]
+        response = self._first_sentence_reply(choice.message.content or "", choice.finish_reason)
+        if response is None:
+            # Stopped inside something like "Dr. Smith" - fetch the whole reply and cut it here
+            logging.info("Early stop hit an abbreviation, retrying without stop sequences")
+            chat_completion = self.hedger.call(
+                self._hedged_attempts(lambda model: request(model, stop=None), model=decision.model),
+                self.response_deadline
+            )
+            text = (chat_completion.choices[0].message.content or "").replace('*', '')
+            response = first_complete_sentence(text) or text.strip()
         return response.replace('*', '')
 
+    def _max_tokens_for(self, user_input, default=None):
+        default = default or self.max_response_tokens
+        match = self.intent_router.classify(user_input)
+        # Generic questions keep their tier's budget; hard ones routed to the large model need it
+        if match and match.intent in EASY_INTENTS and match.intent in self.intent_max_tokens:
+            return min(default, self.intent_max_tokens[match.intent])
+        return default
+
+    def _route_model(self, user_input):
+        match = self.intent_router.classify(user_input)
+        decision = self.model_router.route(user_input, match.intent if match else None)
+        logging.info(f"Routing to {decision.model} (complexity {decision.score:.2f})")
+        return decision
+
+    def _first_sentence_reply(self, text, finish_reason):
+        """Tidy a reply cut at the first sentence boundary; None if the cut looks wrong"""
+        text = text.replace('*', '').strip()
+        if not text:
+            return None
+        if text[-1] in ".!?":
+            return first_complete_sentence(text) or text
+        if finish_reason == "stop" and ends_with_abbreviation(text + "."):
+            return None
+        if finish_reason == "length":
+            # Ran out of tokens mid-sentence: keep a complete sentence if there is one
+            return first_complete_sentence(text) or text + "."
+        return text + "."
+
+    def stream_chat_response(self, user_input):
+        """Yield the reply sentence by sentence while the model is still generating"""
+        self._update_status(BotStatus.PROCESSING_COMMAND)
+        yield from self._stream_sentences(user_input)
+
+    def _stream_sentences(self, user_input, priority=Priority.INTERACTIVE):
+        messages = self._chat_messages(user_input)
+        decision = self._route_model(user_input)
+        max_tokens = self._max_tokens_for(user_input, decision.max_tokens)
+        started = time.time()
+
+        def open_stream(model):
+            stream = self.groq_pool.chat(
+                priority,
+                messages=messages,
+                model=model,
+                max_tokens=max_tokens,
+                stream=True
+            )
+            sentences = stream_sentences(stream)
+            return next(sentences, None), sentences, stream
+
+        # Deadline and hedging cover time to the first sentence; the winner streams the rest
+        first, sentences, stream = self.hedger.call(
+            self._hedged_attempts(open_stream, " first sentence", model=decision.model), self.response_deadline,
+            discard=lambda result: result[2].close()
+        )
+        self.model_router.record_latency(decision, time.time() - started)  # Time to first sentence
+        try:
+            if first:
+                yield first.replace('*', '')
+            for sentence in sentences:
+                yield sentence.replace('*', '')
+        finally:
+            stream.close()
+
+    def respond(self, user_input):
+        """Generate and speak a reply; returns the text that was spoken"""
+        generation = self.reply_generation
+        if not self.stream_responses:
+            self.speculator.cancel()
+            response = self.get_chat_response(user_input)
+            if generation != self.reply_generation:
+                return ""  # The user kept talking; the merged utterance gets its own reply
+            self._reply_ready()
+            self.safe_say(response)
+            return response
+
+        # Questions already answered (or being answered right now) skip Groq
+        context = self._cache_context(user_input)
+        cached = self._semantic_lookup(user_input, context)
+        key = self._cache_key(user_input, context)
+        if not cached:
+            cached, is_leader = self.response_cache.lookup_or_lead(key)
+        if cached:
+            self.speculator.cancel()
+            logging.info("Response cache hit")
+            self._reply_ready()
+            self.safe_say(cached)
+            return cached
+
+        def speak_sentence(sentence):
+            if generation != self.reply_generation:
+                pipeline.cancel()
+                return
+            if self._status == BotStatus.PROCESSING_COMMAND:
+                self._reply_ready()
+            self.safe_say(sentence, cooldown=False)
+
+        # Time-to-first-audio now tracks the first sentence, not the whole generation
+        pipeline = self.speech_pipeline = SpeechPipeline(speak_sentence)
+        asked = user_input
+        speculation = self.speculator.claim(user_input)
+        if speculation:
+            self._update_status(BotStatus.PROCESSING_COMMAND)
+            asked = speculation.text
+            sentences = speculation.sentences()  # Already generating since the partial transcript
+        else:
+            sentences = self.stream_chat_response(user_input)
+        try:
+            response = pipeline.run(sentences)
+        except DeadlineExceeded:
+            self.response_cache.abandon(key)
+            logging.warning("Chat response missed its deadline, using fallback")
+            self._reply_ready()
+            self.safe_say(self.fallback_answer)
+            return self.fallback_answer
+        except Exception:
+            self.response_cache.abandon(key)
+            raise
+        if pipeline.cancelled.is_set():
+            self.response_cache.abandon(key)  # Interrupted replies are incomplete
+        elif normalize_text(asked) != normalize_text(user_input):
+            # The speculation answered the partial's wording; cache it under that, not the final's
+            self.response_cache.abandon(key)
+            self.response_cache.put(self._cache_key(asked, context), response,
+                                    ttl=self._remember_response(asked, response, context))
+        else:
+            self.response_cache.put(key, response, ttl=self._remember_response(user_input, response, context))
+        if pipeline.first_audio_latency is not None:
+            logging.info(f"First sentence spoken after {pipeline.first_audio_latency:.2f}s")
+        return response
+
+    def cancel_reply(self):
+        """Abandon the reply in progress, e.g. because the user hadn't finished talking"""
+        self.reply_generation += 1
+        self.speculator.cancel()
+        if self.speech_pipeline:
+            self.speech_pipeline.cancel()
+        self.tts_player.stop()
+
+    def _reply_ready(self):
+        self._update_status(BotStatus.WAKE_DETECTED)
+        if self.eye_tracker:
+            self.eye_tracker.set_emotion('happy')
+
+    def _build_intent_router(self):
+        """Compile every trigger vocabulary into one matcher; specific intents first"""
+        router = IntentRouter()
+        router.register("goodbye", self.goodbye_phrases)
+        router.register("step_stop", STOP_PHRASES)
+        router.register("step_back", BACK_PHRASES)
+        router.register("step_repeat", REPEAT_PHRASES)
+        router.register("step_next", NEXT_PHRASES)
+        router.register("time", ["what time", "the time", "time is it"],
+                        whole_utterance(TIME_REQUESTS, self._answer_time))
+        router.register("date", ["what day", "what date", "the date", "today's date", "what's the date",
+                                 "day is it", "day is today"],
+                        whole_utterance(DATE_REQUESTS, self._answer_date))
+        router.register("status", ["how are you", "how do you feel", "how are you feeling",
+                                   "status report", "your status"],
+                        whole_utterance(STATUS_REQUESTS, self._answer_status))
+        router.register("identity", ["who are you", "your name", "what are you"],
+                        whole_utterance(IDENTITY_REQUESTS, self._answer_identity))
+        router.register("greeting", self.wake_phrases + ["good morning", "good afternoon", "good evening"],
+                        self._answer_greeting)
+        router.register("steps", self.step_trigger_phrases)
+        router.register("confirm", self.confirmation_words)
+        router.register("query", self.simple_queries)
+        return router
+
+    def _answer_time(self, text, match):
+        return datetime.now().strftime("It's %I:%M %p.").replace(" 0", " ")
+
+    def _answer_date(self, text, match):
+        now = datetime.now()
+        return f"Today is {now.strftime('%A, %B')} {now.day}."
+
+    def _answer_status(self, text, match):
+        emotion = self.emotion_synth.get_current_emotion_str()
+        return f"I'm feeling {emotion} and ready to help."
+
+    def _answer_identity(self, text, match):
+        return "I'm ThinkBot, your robot companion."
+
+    def _answer_greeting(self, text, match):
+        # Only a bare greeting; "hello what is a black hole" is a real question
+        if len(text.split()) - len(match.phrase.split()) > 1:
+            return None
+        return random.choice(["Hello!", "Hi there!", "Hey, what can I do for you?"])
+
+    def start_steps(self, task):
+        """Fetch the whole step list once; next/repeat/back are then served locally"""
+        def fetch(model):
+            return self.groq_pool.chat(
+                Priority.INTERACTIVE,
+                messages=step_list_messages(task),
+                model=model,
+                max_tokens=self.max_step_tokens,
+                response_format={"type": "json_object"}
+            )
+
+        def request():
+            completion = self.hedger.call(self._hedged_attempts(fetch, " steps"), self.step_list_deadline)
+            raw = completion.choices[0].message.content
+            if not parse_step_list(raw)[1]:
+                raise ValueError("No steps in reply")
+            return raw
+
+        key = self.response_cache.make_key(task, self.chat_model, "steps")
+        try:
+            raw, cached = self.response_cache.get_or_compute(key, request, ttl=24 * 3600)
+        except ValueError as e:
+            logging.warning(f"Step list unavailable, answering normally: {e}")
+            return False
+        except DeadlineExceeded:
+            logging.warning("Step list missed its deadline, using fallback")
+            self.safe_say(self.fallback_answer)
+            return True
+
+        title, self.steps = parse_step_list(raw)
+        self.current_step = 0
+        self.in_steps = True
+        intro = f"{title}, in {len(self.steps)} steps." if title else f"Okay, {len(self.steps)} steps."
+        self.conversation.add_turn(task, f"{intro} " + " ".join(self.steps))
+        self._reply_ready()
+        self.safe_say(f"{intro} Say next, repeat or go back whenever you like.")
+        self._say_current_step()
+        return True
+
+    def _say_current_step(self):
+        self.awaiting_step_confirmation = True
+        self.safe_say(describe_step(self.steps, self.current_step))
+
+    def handle_step_navigation(self, text):
+        """Serve next/repeat/back from the stored steps; False if `text` isn't navigation"""
+        if len(text.split()) > 4:
+            return False  # A real question about the step - let the model answer it
+        match = self.intent_router.classify(text)
+        intent = match.intent if match else None
+
+        if intent == "step_stop":
+            self.in_steps = False
+            self.awaiting_step_confirmation = False
+            self.safe_say("Okay, we'll stop there.")
+        elif intent == "step_back":
+            self.current_step = max(0, self.current_step - 1)
+            self._say_current_step()
+        elif intent == "step_repeat":
+            self._say_current_step()
+        elif intent in ("step_next", "confirm"):
+            if self.current_step + 1 >= len(self.steps):
+                self.in_steps = False
+                self.awaiting_step_confirmation = False
+                self.safe_say("That was the last step. Nice work!")
+            else:
+                self.current_step += 1
+                self._say_current_step()
+        else:
+            return False
+        return True
+
+    def _speculation_text(self, partial):
+        """What handle_speech would send to the LLM for this partial, or None"""
+        text = partial.lower().strip()
+        wake, remainder = split_wake_phrase(text, self.wake_phrases)
+        if wake:
+            text = remainder
+        elif not self.is_active:
+            return None
+        if self.in_steps or self.intent_router.answers_locally(text):
+            return None
+        if any(self.intent_router.has_intent(text, intent) for intent in ("goodbye", "steps")):
+            return None
+        return text
+
+    def answer_locally(self, text):
+        """Speak a local answer if the router has one; True when handled"""
+        match, reply = self.intent_router.route(text)
+        if reply is None:
+            return False
+        self.speculator.cancel()
+        logging.info(f"Answered locally ({match.intent})")
+        self._reply_ready()
+        self.safe_say(reply)
+        print("Local Response:", reply)
+        self.conversation.add_turn(text, reply)
+        if self.session_recorder:
+            self.session_recorder.record_event("response", text=reply, intent=match.intent)
+        return True
+
     def listen_for_wake_word(self):
         """Listen for wake word with improved controls"""
         self._update_status(BotStatus.LISTENING_WAKE)
@@ -204,18 +654,18 @@ class ThinkBot:
             self.consecutive_wakes = 0
             return False
             
-        with sr.Microphone() as source:
-            self.recognizer.adjust_for_ambient_noise(source, duration=0.2)
+        if self.wake_spotter.is_ready:
+            return self._spot_wake_word(current_time)
+
+        self.noise_estimator.start()
+        with self.audio_stream.open_reader() as source:
             try:
                 print("Listening for wake word...")
-                audio = self.recognizer.listen(source, timeout=1, phrase_time_limit=2)
-                text = self.recognizer.recognize_google(audio).lower()
+                audio = self.endpointer.capture(source, timeout=1, phrase_time_limit=2)
+                text = self.speech_handler.backend.recognize(audio).lower()
                 
-                if "hello" in text or "hi" in text:
-                    self._update_status(BotStatus.WAKE_DETECTED)
-                    self.wake_word_cooldown = current_time
-                    self.consecutive_wakes += 1
-                    self.listening_start_time = current_time
+                if contains_wake_phrase(text, ["hello", "hi"]):
+                    self._register_wake(current_time)
                     return True
                 else:
                     self.consecutive_wakes = 0
@@ -230,6 +680,49 @@ class ThinkBot:
                 logging.error(f"Could not request results; {e}")
                 return False
 
+    def _spot_wake_word(self, current_time, listen_time=2.0):
+        """Run the local spotter over the live stream - no network round trip"""
+        print("Listening for wake word...")
+        with self.audio_stream.open_reader() as source:
+            self.wake_spotter.reset()
+            deadline = time.time() + listen_time
+            while time.time() < deadline:
+                chunk = source.read(source.CHUNK, timeout=0.5)
+                if not chunk:
+                    continue
+                if self.wake_spotter.process(chunk, source.SAMPLE_RATE, source.SAMPLE_WIDTH):
+                    self._register_wake(current_time)
+                    return True
+        self.consecutive_wakes = 0
+        return False
+
+    def _register_wake(self, current_time):
+        self._update_status(BotStatus.WAKE_DETECTED)
+        self.wake_word_cooldown = current_time
+        self.consecutive_wakes += 1
+        self.listening_start_time = current_time
+
+    def should_recognize(self):
+        """Only send audio for full recognition once the bot has been woken"""
+        return self.is_active or not self.wake_spotter.is_ready
+
+    def on_wake_word(self, detection):
+        """Called from the background spotter thread when the wake word ends"""
+        if self.is_active or self.is_speaking:
+            return
+        print(f"Wake word detected locally (score {detection.score:.2f})")
+        if detection.stream_position is not None:
+            self.speech_handler.mark_wake_end(detection.stream_position)
+        self.activate()
+
+    def activate(self):
+        self.is_active = True
+        self._update_status(BotStatus.WAKE_DETECTED)
+        
+        # Visual feedback with new emotion system
+        if self.eye_tracker:
+            self.eye_tracker.set_emotion('happy')
+
     def enter_learning_mode(self):
         """Handle entering learning mode"""
         self._update_status(BotStatus.LEARNING_MODE)
@@ -266,7 +759,7 @@ class ThinkBot:
         
         try:
             # Initialize teaching components
-            teacher = AITeacher(self.client.api_key)
+            teacher = AITeacher(self.client.api_key, base_url=self.groq_pool.base_url)
             supervisor = AILearningSupervior()
             
             # Backup current version
@@ -357,20 +850,22 @@ class ThinkBot:
         history = len(self.speech_handler.get_command_history())
         self.safe_say(f"I am currently {emotion} and have processed {history} commands")
 
-    def safe_say(self, text):
+    def safe_say(self, text, cooldown=True):
         """Enhanced speech output with better controls"""
         try:
             self.is_speaking = True
-            self.can_listen = False
             
             if self.eye_tracker:
                 self.eye_tracker.set_talking(True)
             
             with self.speech_lock:
-                self.engine.say(text)
-                self.engine.runAndWait()
-                
-            time.sleep(self.speak_cooldown)  # Add cooldown after speaking
+                # Echo-referenced playback keeps the mic open so the user can interrupt
+                if not self.tts_player.speak(text, self.engine):
+                    self.can_listen = False
+                    self.engine.say(text)
+                    self.engine.runAndWait()
+                    if cooldown:
+                        time.sleep(self.speak_cooldown)  # Add cooldown after speaking
                 
         finally:
             if self.eye_tracker:
@@ -421,40 +916,68 @@ class ThinkBot:
             self.current_caption = display_text
             self.last_caption_update = time.time()
 
+    def on_speech(self, text):
+        """Speech callback: stop talking at once on barge-in, then let fragments coalesce"""
+        if self.tts_player.recently_said(text):
+            logging.info(f"Ignoring our own voice leaking into the mic: '{text}'")
+            return
+        self._barge_in()
+        self.coalescer.submit(text)
+
+    def _barge_in(self):
+        if self.is_speaking and self.tts_player.is_playing:
+            # The user is talking over the bot
+            if self.speech_pipeline:
+                self.speech_pipeline.cancel()
+            self.tts_player.stop()
+            return True
+        return False
+
     def handle_speech(self, text):
         """Handle speech with improved emotion handling"""
-        if self.is_speaking or not self.can_listen:
+        if not self._barge_in() and (self.is_speaking or not self.can_listen):
             return
             
         current_time = time.time()
-        if current_time - self.last_response_time < self.speak_cooldown:
+        if (not self.tts_player.available and
+                current_time - self.last_response_time < self.speak_cooldown):
             return
             
         text = text.lower().strip()
+        if self.session_recorder:
+            self.session_recorder.record_event("speech", text=text)
         
         # Wake word detection
-        wake_phrases = ["hey bot", "hey", "hello", "hi", "hey think", "okay bot"]
-        
         if not self.is_active:
-            if any(phrase in text for phrase in wake_phrases):
+            wake, remainder = split_wake_phrase(text, self.wake_phrases)
+            if wake:
                 print("Wake word detected:", text)
-                self.is_active = True
-                self._update_status(BotStatus.WAKE_DETECTED)
-                
-                # Visual feedback with new emotion system
-                if self.eye_tracker:
-                    self.eye_tracker.set_emotion('happy')
+                self.activate()
+                if len(remainder) < self.speech_handler.min_text_length:
+                    return
+                text = remainder  # "hey bot what time is it" - answer in the same turn
                 
-                return
-                
-        elif self.is_active:
-            if "goodbye" in text or "bye" in text:
+        elif text in self.wake_phrases:
+            return  # Bare wake phrase already handled by the local spotter
+        else:
+            wake, remainder = split_wake_phrase(text, self.wake_phrases)
+            if wake and text.startswith(wake):
+                text = remainder  # Spotter woke us mid-phrase; drop the wake words
+
+        if self.is_active:
+
+            if self.intent_router.has_intent(text, "goodbye"):
                 self.is_active = False
+                self.conversation.clear()  # Next wake starts a fresh conversation
+                self.in_steps = False
                 self._update_status(BotStatus.GOODBYE)
                 if self.eye_tracker:
                     self.eye_tracker.set_emotion('neutral')
                 self.safe_say("Goodbye!")
                 return
+
+            if self.in_steps and self.handle_step_navigation(text):
+                return
             
             # Process command
             print("Processing command:", text)
@@ -463,15 +986,19 @@ class ThinkBot:
             try:
                 if self.eye_tracker:
                     self.eye_tracker.set_emotion('focused')
+
+                if self.answer_locally(text):
+                    return
+
+                if self.intent_router.has_intent(text, "steps") and self.start_steps(text):
+                    return
                     
-                response = self.get_chat_response(text)
+                response = self.respond(text)
                 print("AI Response:", response)
-                
-                self._update_status(BotStatus.WAKE_DETECTED)
-                if self.eye_tracker:
-                    self.eye_tracker.set_emotion('happy')
-                
-                self.safe_say(response)
+                if response and response != self.fallback_answer:
+                    self.conversation.add_turn(text, response)
+                if self.session_recorder:
+                    self.session_recorder.record_event("response", text=response)
                 
             except Exception as e:
                 print("Error processing command:", e)
@@ -484,7 +1011,8 @@ class ThinkBot:
     def run(self):
         """Enhanced run loop with caption timeout"""
         self._update_status(BotStatus.IDLE)
-        self.speech_handler.listen_in_background(self.handle_speech)
+        self.wake_spotter.start(self.audio_stream, self.on_wake_word)
+        self.speech_handler.listen_in_background(self.on_speech)
         
         while True:
             try:
@@ -498,6 +1026,7 @@ class ThinkBot:
                     self.update_caption("")
                 time.sleep(0.1)
             except KeyboardInterrupt:
+                self.wake_spotter.stop()
                 self.speech_handler.stop_listening()
                 break
 
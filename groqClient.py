@@ -0,0 +1,103 @@
+import logging
+import os
+import threading
+import time
+import httpx
+from groq import Groq, RateLimitError
+from conversationContext import estimate_tokens
+from rateLimiter import RateLimiter, Priority
+
+try:
+    import h2  # noqa: F401  (httpx only speaks HTTP/2 when h2 is installed)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+DEFAULT_BASE_URL = "https://api.groq.com"
+
+
+class GroqConnectionPool:
+    """One Groq client over a keep-alive httpx pool, shared by every part of the bot
+
+    warm_up() opens (or refreshes) a pooled connection in the background so
+    the DNS/TCP/TLS handshake is already done when the first real request
+    goes out.
+    """
+    def __init__(self, api_key, base_url=None, max_connections=10, max_keepalive=5,
+                 keepalive_expiry=120.0, connect_timeout=3.0, read_timeout=15.0, max_retries=1):
+        self.base_url = base_url or os.environ.get("GROQ_BASE_URL") or DEFAULT_BASE_URL
+        self.keepalive_expiry = keepalive_expiry
+        self.http_client = httpx.Client(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_connections=max_connections,
+                                max_keepalive_connections=max_keepalive,
+                                keepalive_expiry=keepalive_expiry),
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+        )
+        self.client = Groq(api_key=api_key, base_url=self.base_url,
+                           http_client=self.http_client, max_retries=max_retries)
+        self.limiter = RateLimiter()  # Every caller sharing this key shares its rate limits
+        self.last_warm_up = 0.0
+        self.last_warm_up_latency = None
+        self._warming = threading.Lock()
+
+    def warm_up(self, force=False):
+        """Pre-open a connection without blocking; skipped while the pool is still warm"""
+        if not force and time.time() - self.last_warm_up < self.keepalive_expiry / 2:
+            return False
+        if not self._warming.acquire(blocking=False):
+            return False  # Already warming
+        self.last_warm_up = time.time()
+        threading.Thread(target=self._warm_up, daemon=True).start()
+        return True
+
+    def _warm_up(self):
+        started = time.time()
+        try:
+            # Any response will do - the point is the pooled, handshaken connection
+            self.http_client.head(self.base_url)
+            self.last_warm_up_latency = time.time() - started
+            logging.info(f"Groq connection warmed in {self.last_warm_up_latency * 1000:.0f}ms")
+        except httpx.HTTPError as e:
+            self.last_warm_up = 0.0  # Try again on the next wake
+            logging.warning(f"Groq warm-up failed: {e}")
+        finally:
+            self._warming.release()
+
+    def chat(self, priority=Priority.INTERACTIVE, queue_timeout=None, **kwargs):
+        """chat.completions.create() behind the shared rate limiter"""
+        prompt_tokens = sum(estimate_tokens(message["content"]) for message in kwargs.get("messages", []))
+        estimated = prompt_tokens + kwargs.get("max_tokens", 512)
+        with self.limiter.slot(priority, estimated, queue_timeout):
+            try:
+                response = self.client.chat.completions.create(**kwargs)
+            except RateLimitError as e:
+                self.limiter.record_rate_limited(_retry_after(e))
+                raise
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            self.limiter.record_usage(estimated, usage.total_tokens)
+        return response
+
+    def close(self):
+        self.http_client.close()
+
+
+def _retry_after(error):
+    try:
+        return float(error.response.headers.get("retry-after"))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_groq_pool(api_key, base_url=None):
+    """Shared pool per API key and endpoint"""
+    key = (api_key, base_url or os.environ.get("GROQ_BASE_URL") or DEFAULT_BASE_URL)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = GroqConnectionPool(api_key, base_url=key[1])
+        return _pools[key]
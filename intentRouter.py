@@ -0,0 +1,187 @@
+import collections
+import re
+
+# Whole-utterance forms of the questions answered locally. The trigger phrases
+# only find candidates; "what time does the store close" must still reach the LLM.
+TIME_REQUESTS = [
+    r"what time is it( now| right now)?",
+    r"what('s| is) the( current)? time( now| right now)?",
+    r"(the )?(current )?time( please)?",
+    r"(tell me|do you know|can you tell me) (the time|what time it is)",
+]
+DATE_REQUESTS = [
+    r"what('s| is) (the|today's) date( today)?",
+    r"what('s| is) the date today",
+    r"what (day|date) is (it|today)( today)?",
+    r"what day of the (week|month) is (it|today)",
+    r"what('s| is) today",
+    r"(today's|the) date",
+    r"(tell me|do you know|can you tell me) (the date|today's date|what day it is|what day today is)",
+]
+STATUS_REQUESTS = [
+    r"how are you( doing| feeling)?( today)?",
+    r"how do you feel( today)?",
+    r"(give me a |give me your |your )?status( report)?",
+    r"what's your status",
+]
+IDENTITY_REQUESTS = [
+    r"who are you",
+    r"what are you",
+    r"what('s| is) your name",
+    r"(tell me )?your name",
+]
+_FILLER = r"(?:(?:please|um|uh|so|okay|ok|hey)\s+)*"
+
+
+def _normalize(text):
+    return " ".join(re.sub(r"[^\w\s']", " ", text.lower()).split())
+
+
+def whole_utterance(patterns, handler):
+    """Wrap a handler so it only answers when the entire utterance is one of `patterns`"""
+    regex = re.compile(rf"^{_FILLER}(?:{'|'.join(patterns)})(?:\s+please)?$")
+
+    def gated(text, match):
+        if not regex.match(_normalize(text)):
+            return None
+        return handler(text, match)
+    return gated
+
+
+class PhraseMatcher:
+    """Aho-Corasick automaton that finds every known phrase in one pass over the text
+
+    Matches are only reported on word boundaries, so "hi" doesn't fire inside
+    "this" and "bye" doesn't fire inside "maybe".
+    """
+    def __init__(self):
+        self.goto = [{}]     # State -> {char: next state}
+        self.fail = [0]
+        self.output = [[]]   # State -> [(phrase, label)] ending here
+        self.built = True
+
+    def add(self, phrase, label):
+        phrase = phrase.lower().strip()
+        if not phrase:
+            return
+        state = 0
+        for char in phrase:
+            if char not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+                self.goto[state][char] = len(self.goto) - 1
+            state = self.goto[state][char]
+        if (phrase, label) not in self.output[state]:
+            self.output[state].append((phrase, label))
+        self.built = False
+
+    def build(self):
+        """Compute failure links breadth-first"""
+        queue = collections.deque()
+        for state in self.goto[0].values():
+            self.fail[state] = 0
+            queue.append(state)
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                if self.fail[child] == child:
+                    self.fail[child] = 0
+                self.output[child] = self.output[child] + [
+                    match for match in self.output[self.fail[child]] if match not in self.output[child]
+                ]
+        self.built = True
+
+    def find_all(self, text):
+        """Return [(start, end, phrase, label)] for every whole-word match"""
+        if not self.built:
+            self.build()
+        text = text.lower()
+        matches = []
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for phrase, label in self.output[state]:
+                start, end = index - len(phrase) + 1, index + 1
+                if _is_boundary(text, start - 1) and _is_boundary(text, end):
+                    matches.append((start, end, phrase, label))
+        return matches
+
+
+def _is_boundary(text, index):
+    return index < 0 or index >= len(text) or not (text[index].isalnum() or text[index] == "'")
+
+
+class IntentMatch:
+    def __init__(self, intent, phrase, start, end):
+        self.intent = intent
+        self.phrase = phrase
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return f"IntentMatch({self.intent!r}, {self.phrase!r})"
+
+
+class IntentRouter:
+    """Classifies utterances against registered trigger vocabularies
+
+    Intents registered earlier win ties, so register the specific ones
+    (time, date) before broad ones (generic questions). Intents that have a
+    handler can be answered locally; the rest are left for the LLM.
+    """
+    def __init__(self):
+        self.matcher = PhraseMatcher()
+        self.priority = {}   # Intent -> registration order
+        self.handlers = {}   # Intent -> fn(text, match) returning a reply or None
+
+        # Counters
+        self.local_answers = 0
+        self.passed_through = 0
+
+    def register(self, intent, phrases, handler=None):
+        self.priority.setdefault(intent, len(self.priority))
+        for phrase in phrases:
+            self.matcher.add(phrase, intent)
+        if handler:
+            self.handlers[intent] = handler
+
+    def matches(self, text):
+        """All intent matches in the text, best first"""
+        found = [IntentMatch(label, phrase, start, end)
+                 for start, end, phrase, label in self.matcher.find_all(text)]
+        found.sort(key=lambda m: (self.priority[m.intent], -(m.end - m.start), m.start))
+        return found
+
+    def classify(self, text):
+        found = self.matches(text)
+        return found[0] if found else None
+
+    def has_intent(self, text, intent):
+        return any(match.intent == intent for match in self.matches(text))
+
+    def answers_locally(self, text):
+        """Would route() produce a local reply? Doesn't touch the counters"""
+        return any(
+            self.handlers[match.intent](text, match)
+            for match in self.matches(text) if match.intent in self.handlers
+        )
+
+    def route(self, text):
+        """Return (match, reply); reply is None when the LLM should answer"""
+        for match in self.matches(text):
+            handler = self.handlers.get(match.intent)
+            if handler:
+                reply = handler(text, match)
+                if reply:
+                    self.local_answers += 1
+                    return match, reply
+        self.passed_through += 1
+        return self.classify(text), None
@@ -0,0 +1,247 @@
+"""Local stand-in for the Groq chat completions API
+
+Point ThinkBot or AITeacher at it with GROQ_BASE_URL=http://127.0.0.1:8765
+(or ThinkBot(..., groq_base_url=...)) to benchmark without a key or network:
+
+    python mockGroqServer.py --port 8765 --latency lognormal:0.35:0.4 --error-rate 0.02
+"""
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class LatencyModel:
+    """Parses "fixed:0.2", "uniform:0.1:0.5", "normal:0.3:0.05" or "lognormal:median:sigma" """
+    def __init__(self, spec="fixed:0.0", rng=None):
+        kind, *params = spec.split(":")
+        self.kind = kind
+        self.params = [float(p) for p in params]
+        self.rng = rng or random.Random()
+        if kind not in ("fixed", "uniform", "normal", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def sample(self):
+        p = self.params
+        if self.kind == "fixed":
+            return p[0] if p else 0.0
+        if self.kind == "uniform":
+            return self.rng.uniform(p[0], p[1])
+        if self.kind == "normal":
+            return max(0.0, self.rng.gauss(p[0], p[1]))
+        return self.rng.lognormvariate(math.log(max(p[0], 1e-6)), p[1])
+
+
+class MockConfig:
+    def __init__(self, script=None, template="You asked: {prompt}. That is a great question.",
+                 latency="fixed:0.05", chunk_interval="fixed:0.01", error_rate=0.0,
+                 rate_limit_rate=0.0, retry_after=1.0, seed=None):
+        self.rng = random.Random(seed)
+        self.script = [(re.compile(pattern, re.IGNORECASE), reply) for pattern, reply in (script or {}).items()]
+        self.template = template
+        self.latency = LatencyModel(latency, self.rng)                # Time to first byte
+        self.chunk_interval = LatencyModel(chunk_interval, self.rng)  # Between streamed chunks
+        self.error_rate = error_rate            # Fraction answered with HTTP 500
+        self.rate_limit_rate = rate_limit_rate  # Fraction answered with HTTP 429
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+
+    def reply_for(self, prompt):
+        for pattern, reply in self.script:
+            if pattern.search(prompt):
+                return reply
+        return self.template.format(prompt=prompt.strip().rstrip("?.!"))
+
+    def draw(self):
+        """Return (latency, error status or None) for one request"""
+        with self._lock:
+            roll = self.rng.random()
+            latency = self.latency.sample()
+        if roll < self.rate_limit_rate:
+            return latency, 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            return latency, 500
+        return latency, None
+
+    def next_chunk_delay(self):
+        with self._lock:
+            return self.chunk_interval.sample()
+
+
+def _token_count(text):
+    return max(1, len(text) // 4)
+
+
+class MockGroqHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, so client pooling behaves as in production
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            models = [{"id": name, "object": "model", "owned_by": "mock"} for name in self.server.models]
+            self._send_json(200, {"object": "list", "data": models})
+        else:
+            self._send_json(404, {"error": {"message": "Not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "Not found"}})
+            return
+
+        config = self.server.config
+        self.server.count_request()
+        latency, error = config.draw()
+        time.sleep(latency)
+        if error == 429:
+            self._send_json(429, {"error": {"message": "Rate limit reached", "type": "tokens"}},
+                            {"retry-after": str(config.retry_after)})
+            return
+        if error:
+            self._send_json(500, {"error": {"message": "Injected server error"}})
+            return
+
+        messages = request.get("messages", [])
+        prompt = next((m["content"] for m in reversed(messages) if m.get("role") == "user"), "")
+        reply = config.reply_for(prompt)
+        reply, finish_reason = _apply_limits(reply, request.get("max_tokens"), request.get("stop"))
+        model = request.get("model", "mock")
+        usage = {
+            "prompt_tokens": sum(_token_count(m.get("content") or "") for m in messages),
+            "completion_tokens": _token_count(reply),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+        if request.get("stream"):
+            self._stream(reply, model, usage, finish_reason)
+        else:
+            self._send_json(200, {
+                "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "finish_reason": finish_reason,
+                             "message": {"role": "assistant", "content": reply}}],
+                "usage": usage,
+            })
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _stream(self, reply, model, usage, finish_reason="stop"):
+        """Server-sent events, one word per chunk, over chunked transfer encoding"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        pieces = re.findall(r"\S+\s*", reply)
+        for index, piece in enumerate(pieces):
+            if index:
+                time.sleep(self.server.config.next_chunk_delay())
+            delta = {"role": "assistant", "content": piece} if index == 0 else {"content": piece}
+            event = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                     "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+            self._write_chunk(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+        final = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                 "model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}],
+                 "x_groq": {"usage": usage}}
+        self._write_chunk(f"data: {json.dumps(final)}\n\n".encode("utf-8"))
+        self._write_chunk(b"data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+def _apply_limits(reply, max_tokens, stop):
+    """Return (reply, finish_reason) like the API: "length" when max_tokens cut it short"""
+    if stop:
+        for sequence in [stop] if isinstance(stop, str) else stop:
+            position = reply.find(sequence)
+            if position != -1:
+                reply = reply[:position]
+    if max_tokens and len(reply) > max_tokens * 4:
+        return reply[:max_tokens * 4], "length"
+    return reply, "stop"
+
+
+class MockGroqServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0, config=None, verbose=False,
+                 models=("llama3-8b-8192", "llama-3.1-8b-instant", "deepseek-r1-distill-llama-70b")):
+        super().__init__((host, port), MockGroqHandler)
+        self.config = config or MockConfig()
+        self.verbose = verbose
+        self.models = list(models)
+        self.requests_served = 0
+        self._count_lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count_request(self):
+        with self._count_lock:
+            self.requests_served += 1
+
+
+def start_mock_server(port=0, verbose=False, **config):
+    """Run a mock server on a background thread; returns it (see .base_url, .shutdown())"""
+    server = MockGroqServer(port=port, config=MockConfig(**config), verbose=verbose)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local Groq-compatible stub server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--script", help="JSON file mapping regex patterns to replies")
+    parser.add_argument("--template", default="You asked: {prompt}. That is a great question.")
+    parser.add_argument("--latency", default="fixed:0.05", help="e.g. lognormal:0.35:0.4")
+    parser.add_argument("--chunk-interval", default="fixed:0.01")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    script = None
+    if args.script:
+        with open(args.script, "r") as file:
+            script = json.load(file)
+    server = MockGroqServer(port=args.port, verbose=args.verbose, config=MockConfig(
+        script=script, template=args.template, latency=args.latency,
+        chunk_interval=args.chunk_interval, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, seed=args.seed,
+    ))
+    print(f"Mock Groq server on {server.base_url} (set GROQ_BASE_URL to use it)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
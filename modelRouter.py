@@ -0,0 +1,114 @@
+import collections
+import json
+import re
+import threading
+import time
+from requestHedger import LatencyTracker
+
+# Question shapes that usually need reasoning or a longer answer
+HARD_PATTERNS = [
+    r"\bwhy\b", r"\bhow (does|do|did|can|would|could)\b", r"\bexplain\b", r"\bcompare\b",
+    r"\bdifference between\b", r"\bpros and cons\b", r"\bwhat would happen\b", r"\bsummar",
+    r"\bcalculate\b", r"\bsolve\b", r"\bprove\b", r"\bwrite\b", r"\bcode\b", r"\bpoem\b", r"\bstory\b",
+]
+_HARD = re.compile("|".join(HARD_PATTERNS))
+_MATH = re.compile(r"\d+\s*(plus|minus|times|divided|[-+*/^x])\s*\d+|\bpercent\b|\bsquare root\b")
+
+# Intents that are always small talk
+EASY_INTENTS = {"greeting", "confirm", "identity", "status", "goodbye"}
+
+
+class ModelTier:
+    def __init__(self, name, model, max_tokens, max_score):
+        self.name = name
+        self.model = model
+        self.max_tokens = max_tokens
+        self.max_score = max_score  # Highest complexity score this tier takes
+
+
+class RoutingDecision:
+    def __init__(self, text, tier, score, features):
+        self.text = text
+        self.tier = tier
+        self.score = score
+        self.features = features
+        self.created = time.time()
+        self.latency = None
+
+    @property
+    def model(self):
+        return self.tier.model
+
+    @property
+    def max_tokens(self):
+        return self.tier.max_tokens
+
+    def as_dict(self):
+        return {"text": self.text, "tier": self.tier.name, "model": self.model, "score": round(self.score, 3),
+                "features": self.features, "latency": self.latency, "created": self.created}
+
+
+def complexity_features(text, intent=None):
+    words = text.split()
+    return {
+        "words": len(words),
+        "hard_pattern": bool(_HARD.search(text)),
+        "math": bool(_MATH.search(text)),
+        "clauses": sum(text.count(word) for word in (" and ", " because ", " but ", " if ", " or ")),
+        "easy_intent": intent in EASY_INTENTS,
+    }
+
+
+def complexity_score(features):
+    """0 (chit-chat) .. 1 (needs the big model)"""
+    if features["easy_intent"] and features["words"] <= 6:
+        return 0.0
+    score = min(features["words"], 25) / 25.0 * 0.4
+    score += 0.35 if features["hard_pattern"] else 0.0
+    score += 0.25 if features["math"] else 0.0
+    score += min(features["clauses"], 2) * 0.1
+    return min(score, 1.0)
+
+
+class ModelRouter:
+    """Picks a model tier per query from a cheap local complexity score"""
+    def __init__(self, tiers, history=500):
+        self.tiers = sorted(tiers, key=lambda tier: tier.max_score)
+        self.decisions = collections.deque(maxlen=history)
+        self.latency = LatencyTracker()
+        self.counts = collections.Counter()
+        self._lock = threading.Lock()
+
+    def route(self, text, intent=None):
+        features = complexity_features(text.lower(), intent)
+        score = complexity_score(features)
+        tier = next((tier for tier in self.tiers if score <= tier.max_score), self.tiers[-1])
+        decision = RoutingDecision(text, tier, score, features)
+        with self._lock:
+            self.decisions.append(decision)
+            self.counts[tier.name] += 1
+        return decision
+
+    def record_latency(self, decision, seconds):
+        decision.latency = seconds
+        self.latency.record(decision.model, seconds)
+
+    def stats(self):
+        with self._lock:
+            decisions = list(self.decisions)
+        scores = collections.defaultdict(list)
+        for decision in decisions:
+            scores[decision.tier.name].append(decision.score)
+        return {
+            "routed": dict(self.counts),
+            "avg_score": {name: sum(values) / len(values) for name, values in scores.items()},
+            "latency": self.latency.stats(),
+        }
+
+    def export(self, path):
+        """Write recorded decisions as JSON lines for threshold tuning"""
+        with self._lock:
+            decisions = list(self.decisions)
+        with open(path, "w") as file:
+            for decision in decisions:
+                file.write(json.dumps(decision.as_dict()) + "\n")
@@ -0,0 +1,86 @@
+import collections
+import threading
+import numpy as np
+
+
+class NoiseFloorEstimator:
+    """Tracks room noise continuously from the shared capture stream"""
+    def __init__(self, audio_stream, window_seconds=10.0, percentile=20, ratio=2.5,
+                 min_threshold=300, max_threshold=4000, update_interval=0.25):
+        self.audio_stream = audio_stream
+        self.window_seconds = window_seconds
+        self.percentile = percentile        # Low percentile of frame energy = background noise
+        self.ratio = ratio                  # Speech must be this much louder than the floor
+        self.min_threshold = min_threshold
+        self.max_threshold = max_threshold
+        self.update_interval = update_interval
+
+        self.energies = None
+        self.noise_floor = None
+        self.threshold = None
+        self.recognizers = []
+        self.listeners = []
+        self.is_running = False
+        self.estimate_thread = None
+
+    def attach(self, recognizer):
+        """Let the estimator own this recognizer's energy threshold"""
+        recognizer.dynamic_energy_threshold = False  # No more per-listen calibration
+        self.recognizers.append(recognizer)
+        if self.threshold is not None:
+            recognizer.energy_threshold = self.threshold
+
+    def add_listener(self, callback):
+        """callback(threshold, noise_floor) on every update"""
+        self.listeners.append(callback)
+
+    def start(self):
+        if self.is_running:
+            return
+        self.is_running = True
+        self.estimate_thread = threading.Thread(target=self._estimate_loop, daemon=True)
+        self.estimate_thread.start()
+
+    def _estimate_loop(self):
+        with self.audio_stream.open_reader() as source:
+            chunk_seconds = float(source.CHUNK) / source.SAMPLE_RATE
+            self.energies = collections.deque(maxlen=max(1, int(self.window_seconds / chunk_seconds)))
+            chunks_per_update = max(1, int(self.update_interval / chunk_seconds))
+            chunks_since_update = 0
+
+            while self.is_running:
+                chunk = source.read_view(source.CHUNK, timeout=0.5)  # Measured and dropped, no copy needed
+                if not chunk:
+                    if not self.audio_stream.is_running:
+                        break
+                    continue
+                self.energies.append(self.frame_energy(chunk, source.SAMPLE_WIDTH))
+                chunks_since_update += 1
+                if chunks_since_update >= chunks_per_update:
+                    chunks_since_update = 0
+                    self._update()
+        self.is_running = False
+
+    @staticmethod
+    def frame_energy(chunk, sample_width=2):
+        """RMS energy on the same scale as sr.Recognizer.energy_threshold"""
+        dtype = {1: np.int8, 2: "<i2", 4: "<i4"}[sample_width]
+        samples = np.frombuffer(chunk, dtype=dtype).astype(np.float64)
+        if len(samples) == 0:
+            return 0.0
+        return float(np.sqrt(np.mean(samples * samples)))
+
+    def _update(self):
+        self.noise_floor = float(np.percentile(self.energies, self.percentile))
+        self.threshold = min(self.max_threshold, max(self.min_threshold, self.noise_floor * self.ratio))
+
+        # Plain attribute writes - listeners never wait on the estimator
+        for recognizer in self.recognizers:
+            recognizer.energy_threshold = self.threshold
+        for callback in self.listeners:
+            callback(self.threshold, self.noise_floor)
+
+    def stop(self):
+        self.is_running = False
+        if self.estimate_thread:
+            self.estimate_thread.join(timeout=1)
@@ -0,0 +1,136 @@
+import collections
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from enum import IntEnum
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0  # Spoken replies - the user is waiting
+    LEARNING = 1     # AITeacher code generation
+    BACKGROUND = 2   # Warm-ups, speculative or batch work
+
+
+class TokenBucket:
+    """Refills continuously at `per_minute`, holds at most `capacity`; may go into debt"""
+    def __init__(self, per_minute, capacity=None):
+        self.rate = per_minute / 60.0
+        self.capacity = float(capacity if capacity is not None else per_minute)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self, now):
+        self._refill(now)
+        return self.level
+
+    def time_until(self, amount, now, reserve=0.0):
+        """Seconds until `amount` can be taken while leaving `reserve` in the bucket"""
+        needed = min(amount + reserve, self.capacity) - self.available(now)
+        return max(0.0, needed / self.rate)
+
+    def take(self, amount, now):
+        self._refill(now)
+        self.level -= amount
+
+    def drain(self, now):
+        self._refill(now)
+        self.level = min(self.level, 0.0)
+
+
+class RateLimiter:
+    """Request- and token-per-minute budget shared by every Groq caller
+
+    Callers queue by priority; the head of the queue is served as soon as
+    both buckets allow. Lower priorities must leave `reserve` of each bucket
+    untouched so a burst of learning requests can't starve spoken replies.
+    """
+    def __init__(self, requests_per_minute=30, tokens_per_minute=6000, reserve=0.2):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.reserve = reserve
+        self.paused_until = 0.0  # Set from a 429's retry-after
+        self._queue = []         # Heap of (priority, sequence)
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+        # Metrics
+        self.granted = collections.Counter()
+        self.rate_limited = 0
+        self.wait_times = collections.defaultdict(lambda: collections.deque(maxlen=100))
+
+    def _wait_needed(self, priority, tokens, now):
+        reserve = self.reserve if priority > Priority.INTERACTIVE else 0.0
+        return max(
+            self.paused_until - now,
+            self.requests.time_until(1, now, reserve * self.requests.capacity),
+            self.tokens.time_until(tokens, now, reserve * self.tokens.capacity),
+        )
+
+    def acquire(self, priority=Priority.INTERACTIVE, tokens=0, timeout=None):
+        """Block until this call may go out; False if `timeout` passed first"""
+        entry = (int(priority), next(self._sequence))
+        started = time.monotonic()
+        with self._condition:
+            heapq.heappush(self._queue, entry)
+            try:
+                while True:
+                    now = time.monotonic()
+                    if self._queue[0] == entry:
+                        wait = self._wait_needed(priority, tokens, now)
+                        if wait <= 0:
+                            break
+                    else:
+                        wait = 0.25  # Re-checked when the head is served
+                    if timeout is not None:
+                        remaining = started + timeout - now
+                        if remaining <= 0:
+                            return False
+                        wait = min(wait, remaining)
+                    self._condition.wait(wait)
+                self.requests.take(1, now)
+                self.tokens.take(tokens, now)
+                self.granted[Priority(priority).name] += 1
+                self.wait_times[Priority(priority).name].append(now - started)
+                return True
+            finally:
+                self._queue.remove(entry)
+                heapq.heapify(self._queue)
+                self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, priority=Priority.INTERACTIVE, tokens=0, timeout=None):
+        if not self.acquire(priority, tokens, timeout):
+            raise TimeoutError(f"Rate limiter queue wait exceeded {timeout}s")
+        yield
+
+    def record_usage(self, estimated, actual):
+        """Correct the token bucket once the real usage is known"""
+        with self._condition:
+            self.tokens.take(actual - estimated, time.monotonic())
+
+    def record_rate_limited(self, retry_after=None):
+        """The server said 429 - stop everyone until it is safe to retry"""
+        with self._condition:
+            now = time.monotonic()
+            self.rate_limited += 1
+            self.requests.drain(now)
+            self.paused_until = max(self.paused_until, now + (retry_after or 2.0))
+            self._condition.notify_all()
+
+    def metrics(self):
+        with self._condition:
+            depth = collections.Counter(Priority(priority).name for priority, _ in self._queue)
+            waits = {name: list(samples) for name, samples in self.wait_times.items()}
+            return {
+                "queue_depth": dict(depth),
+                "granted": dict(self.granted),
+                "rate_limited": self.rate_limited,
+                "avg_wait": {name: sum(samples) / len(samples) for name, samples in waits.items() if samples},
+                "max_wait": {name: max(samples) for name, samples in waits.items() if samples},
+            }
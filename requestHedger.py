@@ -0,0 +1,158 @@
+import collections
+import concurrent.futures
+import logging
+import threading
+import time
+import numpy as np
+
+
+class DeadlineExceeded(TimeoutError):
+    """No attempt finished before the request deadline"""
+
+
+class LatencyTracker:
+    """Rolling per-model latency samples"""
+    def __init__(self, window=200):
+        self.window = window
+        self.samples = collections.defaultdict(lambda: collections.deque(maxlen=self.window))
+        self.failures = collections.Counter()
+        self._lock = threading.Lock()
+
+    def record(self, label, seconds):
+        with self._lock:
+            self.samples[label].append(seconds)
+
+    def record_failure(self, label):
+        with self._lock:
+            self.failures[label] += 1
+
+    def count(self, label):
+        with self._lock:
+            return len(self.samples[label])
+
+    def percentile(self, label, percentile):
+        with self._lock:
+            samples = list(self.samples[label])
+        if not samples:
+            return None
+        return float(np.percentile(samples, percentile))
+
+    def stats(self):
+        with self._lock:
+            labels = list(self.samples)
+        return {
+            label: {
+                "count": self.count(label),
+                "p50": self.percentile(label, 50),
+                "p90": self.percentile(label, 90),
+                "p99": self.percentile(label, 99),
+                "failures": self.failures[label],
+            }
+            for label in labels
+        }
+
+
+class HedgedCaller:
+    """Runs a request with a deadline, sending a backup copy if the first one is slow
+
+    The backup goes out once the primary has taken longer than its model's
+    `hedge_percentile` latency (a fixed delay until enough samples exist),
+    or immediately if the primary fails. Whichever finishes first wins; the
+    loser is handed to `discard` when it eventually completes.
+    """
+    def __init__(self, tracker=None, hedge_percentile=90, default_hedge_delay=1.5,
+                 min_hedge_delay=0.3, min_samples=10, max_workers=4):
+        self.tracker = tracker or LatencyTracker()
+        self.hedge_percentile = hedge_percentile
+        self.default_hedge_delay = default_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.min_samples = min_samples
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers,
+                                                              thread_name_prefix="hedge")
+        # Counters
+        self.calls = 0
+        self.hedges_sent = 0
+        self.hedges_won = 0
+        self.deadlines_missed = 0
+
+    def hedge_delay(self, label):
+        if self.tracker.count(label) < self.min_samples:
+            return self.default_hedge_delay
+        return max(self.min_hedge_delay, self.tracker.percentile(label, self.hedge_percentile))
+
+    def _submit(self, label, fn):
+        started = time.time()
+
+        def timed():
+            try:
+                result = fn()
+            except Exception:
+                self.tracker.record_failure(label)
+                raise
+            self.tracker.record(label, time.time() - started)
+            return result
+        return self.executor.submit(timed)
+
+    def call(self, attempts, deadline, discard=None):
+        """Run [(label, fn), ...] - primary first, then backups - within `deadline` seconds"""
+        self.calls += 1
+        give_up_at = time.time() + deadline
+        pending = list(attempts)
+        futures = {}  # Future -> label
+
+        label, fn = pending.pop(0)
+        primary = self._submit(label, fn)
+        futures[primary] = label
+        next_hedge_at = time.time() + self.hedge_delay(label)
+        last_error = None
+
+        while futures:
+            now = time.time()
+            if now >= give_up_at:
+                break
+            wait_until = min(give_up_at, next_hedge_at) if pending else give_up_at
+            done, _ = concurrent.futures.wait(list(futures), timeout=max(0.0, wait_until - now),
+                                              return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                label = futures.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    last_error = e
+                    logging.warning(f"{label} request failed: {e}")
+                    next_hedge_at = time.time()  # Fail fast to the backup
+                    continue
+                if future is not primary:
+                    self.hedges_won += 1
+                self._discard_rest(futures, discard)
+                return result
+
+            if pending and time.time() >= next_hedge_at:
+                label, fn = pending.pop(0)
+                self.hedges_sent += 1
+                logging.info(f"Hedging slow request with {label}")
+                futures[self._submit(label, fn)] = label
+                next_hedge_at = time.time() + self.hedge_delay(label)
+
+        self._discard_rest(futures, discard)
+        if futures or time.time() >= give_up_at:
+            self.deadlines_missed += 1
+            raise DeadlineExceeded(f"No response within {deadline:.1f}s")
+        raise last_error
+
+    def _discard_rest(self, futures, discard):
+        if not discard:
+            return
+        for future in futures:
+            future.add_done_callback(
+                lambda f: discard(f.result()) if not f.cancelled() and f.exception() is None else None
+            )
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "hedges_sent": self.hedges_sent,
+            "hedges_won": self.hedges_won,
+            "deadlines_missed": self.deadlines_missed,
+            "latency": self.tracker.stats(),
+        }
@@ -0,0 +1,162 @@
+import collections
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+
+def normalize_text(text):
+    """Case-, punctuation- and whitespace-insensitive form of a user query"""
+    text = re.sub(r"[^\w\s']", " ", text.lower())
+    return " ".join(text.split())
+
+
+class _Flight:
+    """One upstream call in progress; carries its result to the callers waiting on it"""
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+
+
+class ResponseCache:
+    """LRU + TTL cache for LLM replies with single-flight de-duplication
+
+    Concurrent misses on the same key collapse into one upstream call: the
+    first caller becomes the leader, everyone else waits for its result.
+    """
+    def __init__(self, max_entries=256, default_ttl=600.0, persist_path=None):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.persist_path = persist_path
+        self._entries = collections.OrderedDict()  # key -> (value, expires_at wall-clock)
+        self._in_flight = {}                       # key -> _Flight
+        self._lock = threading.Lock()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+        if persist_path and os.path.exists(persist_path):
+            self.load()
+
+    def make_key(self, text, model, context=""):
+        raw = json.dumps([normalize_text(text), model, context])
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _get_locked(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at < time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def get(self, key):
+        with self._lock:
+            value = self._get_locked(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value
+
+    def put(self, key, value, ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            if ttl > 0 and value:
+                self._entries[key] = (value, time.time() + ttl)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            flight = self._in_flight.pop(key, None)
+        if flight:
+            flight.value = value  # Waiters get it even when it isn't stored (ttl 0)
+            flight.done.set()
+        if self.persist_path and ttl > 0:
+            self.save()
+
+    def lookup_or_lead(self, key, timeout=30.0):
+        """Return (value, is_leader)
+
+        A hit returns (value, False). On a miss the first caller gets
+        (None, True) and must finish with put() or abandon(); concurrent
+        callers for the same key wait for the leader and get its value.
+        """
+        with self._lock:
+            value = self._get_locked(key)
+            if value is not None:
+                self.hits += 1
+                return value, False
+            flight = self._in_flight.get(key)
+            if flight is None:
+                self._in_flight[key] = _Flight()
+                self.misses += 1
+                return None, True
+            self.coalesced += 1
+
+        flight.done.wait(timeout)
+        value = flight.value
+        if value is None:
+            with self._lock:
+                value = self._get_locked(key)
+        if value is not None:
+            return value, False
+        return self.lookup_or_lead(key, timeout)  # Leader gave up; try to lead ourselves
+
+    def abandon(self, key):
+        """Leader failed - release any waiters"""
+        with self._lock:
+            flight = self._in_flight.pop(key, None)
+        if flight:
+            flight.done.set()
+
+    def get_or_compute(self, key, compute, ttl=None):
+        """Return (value, was_cached), calling compute() at most once per key at a time"""
+        value, is_leader = self.lookup_or_lead(key)
+        if not is_leader:
+            return value, True
+        try:
+            value = compute()
+        except Exception:
+            self.abandon(key)
+            raise
+        self.put(key, value, ttl)
+        return value, False
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+            }
+
+    def save(self):
+        with self._lock:
+            data = {key: [value, expires_at] for key, (value, expires_at) in self._entries.items()}
+        temp_path = self.persist_path + ".tmp"
+        with open(temp_path, "w") as file:
+            json.dump(data, file)
+        os.replace(temp_path, self.persist_path)
+
+    def load(self):
+        try:
+            with open(self.persist_path, "r") as file:
+                data = json.load(file)
+        except (OSError, ValueError) as e:
+            print(f"Could not load response cache: {e}")
+            return
+        now = time.time()
+        with self._lock:
+            for key, (value, expires_at) in data.items():
+                if expires_at > now:
+                    self._entries[key] = (value, expires_at)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
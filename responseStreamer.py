@@ -0,0 +1,115 @@
+import queue
+import re
+import threading
+import time
+
+# Words whose trailing period doesn't end a sentence
+ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc", "e.g", "i.e",
+    "approx", "no", "fig", "inc", "ltd", "co", "u.s", "a.m", "p.m",
+}
+
+# Sentence punctuation (plus closing quotes/brackets) followed by whitespace
+_BOUNDARY = re.compile(r"[.!?]+[\"')\]]*\s+")
+
+
+def ends_with_abbreviation(text):
+    """True if `text` ends in something like "Dr." that isn't a sentence end"""
+    words = text.rstrip().split()
+    if not words:
+        return False
+    last = words[-1].lower().rstrip(".")
+    return last in ABBREVIATIONS or (len(last) == 1 and last.isalpha())
+
+
+class SentenceChunker:
+    """Cuts a token stream into complete sentences as soon as each one ends"""
+    def __init__(self, min_length=2):
+        self.min_length = min_length
+        self.buffer = ""
+
+    def feed(self, text):
+        """Add streamed text; returns the sentences it completed"""
+        self.buffer += text
+        sentences = []
+        search_from = 0
+        while True:
+            match = _BOUNDARY.search(self.buffer, search_from)
+            if not match:
+                break
+            candidate = self.buffer[:match.end()].strip()
+            if ends_with_abbreviation(candidate) or len(candidate) < self.min_length:
+                search_from = match.end()
+                continue
+            sentences.append(candidate)
+            self.buffer = self.buffer[match.end():]
+            search_from = 0
+        return sentences
+
+    def flush(self):
+        """Whatever is left when the stream ends"""
+        remainder, self.buffer = self.buffer.strip(), ""
+        return [remainder] if remainder else []
+
+
+def first_complete_sentence(text):
+    """Leading sentence of `text`, skipping abbreviation periods; None if there isn't one"""
+    sentences = SentenceChunker().feed(text.strip() + " ")
+    return sentences[0] if sentences else None
+
+
+def stream_sentences(chunks):
+    """Turn a chat.completions stream into a generator of sentences"""
+    chunker = SentenceChunker()
+    for chunk in chunks:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            for sentence in chunker.feed(delta):
+                yield sentence
+    for sentence in chunker.flush():
+        yield sentence
+
+
+class SpeechPipeline:
+    """Speaks sentences on one thread while later sentences are still being generated"""
+    def __init__(self, speak):
+        self.speak = speak  # Blocking TTS call for one sentence
+        self.cancelled = threading.Event()
+        self.first_audio_latency = None  # Seconds from run() to the first sentence reaching TTS
+        self.total_time = None
+
+    def run(self, sentences):
+        """Consume a sentence iterator, speaking each as it arrives; returns the spoken text"""
+        pending = queue.Queue()
+        spoken = []
+        started = time.time()
+        self.cancelled.clear()
+
+        def speak_loop():
+            while True:
+                sentence = pending.get()
+                if sentence is None or self.cancelled.is_set():
+                    return
+                if self.first_audio_latency is None:
+                    self.first_audio_latency = time.time() - started
+                self.speak(sentence)
+                spoken.append(sentence)
+
+        speaker = threading.Thread(target=speak_loop, daemon=True)
+        speaker.start()
+        try:
+            for sentence in sentences:
+                if self.cancelled.is_set():
+                    break
+                pending.put(sentence)
+        finally:
+            pending.put(None)
+            speaker.join()
+            self.total_time = time.time() - started
+        return " ".join(spoken)
+
+    def cancel(self):
+        """Stop after the sentence currently being spoken"""
+        self.cancelled.set()
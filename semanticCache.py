@@ -0,0 +1,161 @@
+import threading
+import time
+import zlib
+import numpy as np
+from responseCache import normalize_text
+
+# Words that carry no meaning for "is this the same question"
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "to", "of", "in", "on", "at", "for",
+    "me", "you", "your", "i", "my", "it", "its", "it's", "this", "that", "please", "can", "could",
+    "would", "do", "does", "did", "tell", "about", "what's", "whats", "so", "just", "now", "hey",
+    "thinkbot", "bot", "um", "uh", "like", "some", "any", "what", "explain", "describe", "define",
+    "know", "say",
+}
+
+
+def content_words(text):
+    return [word for word in normalize_text(text).split() if word not in STOPWORDS]
+
+
+# Longest first, so "inventions" loses "ions" rather than "s"
+SUFFIXES = ("ations", "ation", "ions", "ion", "ings", "ing", "ers", "ors", "er", "or", "ed", "es", "ly", "s")
+
+
+def stem(word):
+    """Crude suffix-stripping stem; never shortens a word below 4 letters"""
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 4:
+            return word[:-len(suffix)]
+    return word
+
+
+def words_match(first, second):
+    """Same word or the same stem ("invented" / "inventor"); numbers only match exactly"""
+    if first == second:
+        return True
+    if any(char.isdigit() for char in first + second):
+        return False
+    return stem(first) == stem(second)
+
+
+def covers(words, other_words):
+    """Every content word in `words` has a counterpart in `other_words`"""
+    return all(any(words_match(word, other) for other in other_words) for word in words)
+
+
+class HashedNgramEmbedder:
+    """Bag of hashed word, word-pair and character trigram features, L2-normalized float32
+
+    Character trigrams put "invented" and "inventor" close together; stopwords
+    are dropped so filler like "tell me" doesn't dominate short questions.
+    """
+    def __init__(self, dim=512, char_ngram=3, word_weight=2.0):
+        self.dim = dim
+        self.char_ngram = char_ngram
+        self.word_weight = word_weight
+
+    def _features(self, text):
+        words = content_words(text)
+        for word in words:
+            yield "w:" + word, self.word_weight
+            padded = f"<{word}>"
+            for i in range(max(1, len(padded) - self.char_ngram + 1)):
+                yield "c:" + padded[i:i + self.char_ngram], 1.0
+        for first, second in zip(words, words[1:]):
+            yield f"b:{first} {second}", self.word_weight
+
+    def embed(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, weight in self._features(text):
+            digest = zlib.crc32(feature.encode("utf-8"))
+            sign = 1.0 if digest & 0x80000000 else -1.0  # Signed hashing keeps collisions unbiased
+            vector[digest % self.dim] += sign * weight
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+
+class SemanticCache:
+    """Answers paraphrased repeat questions from a fixed-size float32 vector index
+
+    A lookup is one matrix-vector product over every slot. Candidates above
+    the cosine threshold must also share every content word (up to stemming)
+    with the query, so "capital of France" never answers "capital of Spain".
+    Entries only match within the same context string (model, emotion,
+    conversation), expire after their TTL and are evicted least-recently-used
+    when the index is full.
+    """
+    def __init__(self, threshold=0.5, max_entries=256, default_ttl=600.0, embedder=None):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.embedder = embedder or HashedNgramEmbedder()
+        self.vectors = np.zeros((max_entries, self.embedder.dim), dtype=np.float32)
+        self.expires = np.zeros(max_entries)     # 0 marks an empty slot
+        self.last_used = np.zeros(max_entries)
+        self.texts = [None] * max_entries
+        self.words = [None] * max_entries
+        self.values = [None] * max_entries
+        self.contexts = [None] * max_entries
+        self._lock = threading.Lock()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, text, context=""):
+        """Return (value, similarity, matched_text) for the best match above threshold, else None"""
+        query = self.embedder.embed(text)
+        if not query.any():
+            return None
+        words = content_words(text)
+        now = time.time()
+        with self._lock:
+            scores = self.vectors @ query
+            scores[self.expires < now] = -1.0  # Empty and expired slots
+            for slot in np.flatnonzero(scores >= self.threshold):
+                if (self.contexts[slot] != context or not covers(words, self.words[slot])
+                        or not covers(self.words[slot], words)):
+                    scores[slot] = -1.0
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                self.misses += 1
+                return None
+            self.last_used[best] = now
+            self.hits += 1
+            return self.values[best], float(scores[best]), self.texts[best]
+
+    def put(self, text, value, context="", ttl=None):
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0 or not value:
+            return
+        vector = self.embedder.embed(text)
+        if not vector.any():
+            return
+        now = time.time()
+        with self._lock:
+            # Reuse an empty/expired slot, otherwise evict the least recently used
+            free = np.flatnonzero(self.expires < now)
+            slot = int(free[0]) if len(free) else int(np.argmin(self.last_used))
+            self.vectors[slot] = vector
+            self.expires[slot] = now + ttl
+            self.last_used[slot] = now
+            self.texts[slot] = text
+            self.words[slot] = content_words(text)
+            self.values[slot] = value
+            self.contexts[slot] = context
+
+    def clear(self):
+        with self._lock:
+            self.expires[:] = 0
+            self.values = [None] * self.max_entries
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": int(np.count_nonzero(self.expires >= time.time())),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,161 @@
+import json
+import struct
+import sys
+import threading
+import time
+
+# File layout: MAGIC, u32 header length, JSON header, then records of
+# (u8 kind, f64 seconds since start, u32 payload length, payload)
+MAGIC = b"TBSR1"
+RECORD_HEADER = struct.Struct("<BdI")
+KIND_AUDIO = 0
+KIND_EVENT = 1
+
+
+class SessionRecorder:
+    """Writes raw captured audio and timestamped events to a compact session file"""
+    def __init__(self, path, audio_stream):
+        self.path = path
+        self.audio_stream = audio_stream
+        self.file = None
+        self.start_time = None
+        self.chunks = 0
+        self.events = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Open the file and tap the capture stream ahead of any other processing"""
+        self.audio_stream.start()
+        header = json.dumps({
+            "sample_rate": self.audio_stream.sample_rate,
+            "sample_width": self.audio_stream.sample_width,
+            "chunk_size": self.audio_stream.chunk_size,
+            "created": time.time(),
+        }).encode("utf-8")
+        self.file = open(self.path, "wb")
+        self.file.write(MAGIC + struct.pack("<I", len(header)) + header)
+        self.start_time = time.time()
+        # First in line so the recording holds the raw microphone signal
+        self.audio_stream.processors.insert(0, self._on_chunk)
+
+    def _write(self, kind, payload):
+        with self._lock:
+            if self.file is None:
+                return
+            self.file.write(RECORD_HEADER.pack(kind, time.time() - self.start_time, len(payload)))
+            self.file.write(payload)
+
+    def _on_chunk(self, chunk, sample_rate, sample_width):
+        self._write(KIND_AUDIO, bytes(chunk))
+        self.chunks += 1
+        return chunk
+
+    def record_event(self, name, **data):
+        """Log a timestamped event (status change, transcript, response...)"""
+        if self.file is None:
+            return
+        self._write(KIND_EVENT, json.dumps({"name": name, "data": data}).encode("utf-8"))
+        self.events += 1
+
+    def stop(self):
+        if self._on_chunk in self.audio_stream.processors:
+            self.audio_stream.processors.remove(self._on_chunk)
+        with self._lock:
+            if self.file:
+                self.file.close()
+                self.file = None
+
+
+def read_session(path):
+    """Return (header, records) where records are (kind, timestamp, payload)"""
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a ThinkBot session recording")
+        header_length = struct.unpack("<I", file.read(4))[0]
+        header = json.loads(file.read(header_length).decode("utf-8"))
+        records = []
+        while True:
+            raw = file.read(RECORD_HEADER.size)
+            if len(raw) < RECORD_HEADER.size:
+                break
+            kind, timestamp, length = RECORD_HEADER.unpack(raw)
+            payload = file.read(length)
+            if kind == KIND_EVENT:
+                payload = json.loads(payload.decode("utf-8"))
+            records.append((kind, timestamp, payload))
+    return header, records
+
+
+class ReplayStream:
+    """PyAudio-style stream that serves recorded audio on the recorded schedule"""
+    def __init__(self, source):
+        self.source = source
+        self.pending = b""
+
+    def read(self, frames):
+        size = frames * self.source.SAMPLE_WIDTH
+        while len(self.pending) < size:
+            chunk = self.source.next_chunk()
+            if chunk is None:
+                break
+            self.pending += chunk
+        data, self.pending = self.pending[:size], self.pending[size:]
+        return data
+
+
+class ReplaySource:
+    """Drop-in microphone that feeds a recorded session back through the capture path
+
+    speed=1.0 replays in real time, 4.0 four times faster, 0 as fast as possible.
+    """
+    def __init__(self, path, speed=1.0, on_event=None):
+        self.header, self.records = read_session(path)
+        self.speed = speed
+        self.on_event = on_event  # Called with each recorded event as replay reaches it
+        self.SAMPLE_RATE = self.header["sample_rate"]
+        self.SAMPLE_WIDTH = self.header["sample_width"]
+        self.CHUNK = self.header["chunk_size"]
+        self.stream = None
+        self.index = 0
+        self.replay_start = None
+
+    def __enter__(self):
+        self.stream = ReplayStream(self)
+        self.index = 0
+        self.replay_start = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stream = None
+
+    def next_chunk(self):
+        """Next recorded audio chunk, sleeping until it is due; None at the end"""
+        while self.index < len(self.records):
+            kind, timestamp, payload = self.records[self.index]
+            self.index += 1
+            if self.speed > 0:
+                delay = self.replay_start + timestamp / self.speed - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+            if kind == KIND_AUDIO:
+                return payload
+            if self.on_event:
+                self.on_event(payload["name"], payload["data"])
+        return None
+
+
+def summarize(path):
+    header, records = read_session(path)
+    audio = [r for r in records if r[0] == KIND_AUDIO]
+    events = [r for r in records if r[0] == KIND_EVENT]
+    duration = records[-1][1] if records else 0.0
+    audio_seconds = sum(len(r[2]) for r in audio) / float(header["sample_rate"] * header["sample_width"])
+    print(f"{path}: {duration:.1f}s session, {audio_seconds:.1f}s audio in {len(audio)} chunks, "
+          f"{len(events)} events @ {header['sample_rate']} Hz")
+    for kind, timestamp, event in events:
+        print(f"  {timestamp:8.3f}  {event['name']}: {event['data']}")
+
+
+if __name__ == "__main__":
+    for session_path in sys.argv[1:]:
+        summarize(session_path)
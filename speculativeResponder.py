@@ -0,0 +1,162 @@
+import logging
+import threading
+import time
+from semanticCache import content_words, covers
+
+
+def same_request(first, second):
+    """Both ask the same thing: every content word has a match in the other and the numbers agree in order
+
+    Filler ("um", "the", "please") may differ; "12 times 13" and "12 times 14",
+    or "divide 10 by 2" and "divide 2 by 10", may not. Texts with no content
+    words ("what is this") never match.
+    """
+    first, second = content_words(first), content_words(second)
+    if not first or not second:
+        return False
+    if _numbers(first) != _numbers(second):
+        return False
+    return covers(first, second) and covers(second, first)
+
+
+def _numbers(words):
+    return [word for word in words if any(char.isdigit() for char in word)]
+
+
+class Speculation:
+    """One speculative completion running on a background thread"""
+    def __init__(self, text):
+        self.text = text
+        self.started = time.time()
+        self.finished = None
+        self.collected = []
+        self.error = None
+        self.cancelled = threading.Event()
+        self._condition = threading.Condition()
+
+    def _run(self, generate):
+        sentences = generate(self.text)
+        try:
+            for sentence in sentences:
+                if self.cancelled.is_set():
+                    break
+                with self._condition:
+                    self.collected.append(sentence)
+                    self._condition.notify_all()
+        except Exception as e:
+            self.error = e
+        finally:
+            sentences.close()  # Releases the HTTP stream when cancelled
+            with self._condition:
+                self.finished = time.time()
+                self._condition.notify_all()
+
+    def sentences(self):
+        """Yield collected sentences, waiting for the rest; re-raises a failed request"""
+        index = 0
+        while True:
+            with self._condition:
+                while index >= len(self.collected) and self.finished is None:
+                    self._condition.wait()
+                if index < len(self.collected):
+                    sentence = self.collected[index]
+                elif self.error:
+                    raise self.error
+                else:
+                    return
+            index += 1
+            yield sentence
+
+    def cancel(self):
+        self.cancelled.set()
+
+
+class SpeculativeResponder:
+    """Starts the LLM request on a stable partial transcript, before the final one is ready
+
+    A partial is "stable" once it hasn't changed for `stable_time` seconds.
+    The final transcript claims the speculation if it asks the same thing
+    (see same_request); anything else (or a partial that keeps changing)
+    cancels it.
+    """
+    def __init__(self, generate, should_speculate=None, stable_time=0.35, min_words=3):
+        self.generate = generate                  # fn(text) -> iterator of sentences
+        self.should_speculate = should_speculate  # fn(text) -> text to speculate on, or None
+        self.stable_time = stable_time
+        self.min_words = min_words
+        self.current = None
+        self._timer = None
+        self._lock = threading.Lock()
+
+        # Stats
+        self.started = 0
+        self.hits = 0
+        self.misses = 0
+        self.latency_saved = 0.0  # Total seconds of head start on claimed speculations
+
+    def on_partial(self, text):
+        """Partial-transcript hook; must stay cheap, it runs on the capture thread"""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+            if self.current and not same_request(text, self.current.text):
+                self._cancel_locked()  # The user kept talking
+            self._timer = threading.Timer(self.stable_time, self._speculate, args=(text,))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _speculate(self, text):
+        if self.should_speculate:
+            text = self.should_speculate(text)
+        if not text or len(text.split()) < self.min_words:
+            return
+        with self._lock:
+            if self.current and same_request(text, self.current.text):
+                return  # Already running for this request
+            self._cancel_locked()
+            self.current = Speculation(text)
+            self.started += 1
+            speculation = self.current
+        logging.info(f"Speculating on '{text}'")
+        threading.Thread(target=speculation._run, args=(self.generate,), daemon=True).start()
+
+    def claim(self, final_text):
+        """The running speculation if it matches the final transcript, else None"""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+            speculation, self.current = self.current, None
+        if speculation is None:
+            return None
+        if same_request(final_text, speculation.text) and not speculation.cancelled.is_set():
+            saved = time.time() - speculation.started
+            self.hits += 1
+            self.latency_saved += saved
+            logging.info(f"Speculation hit, {saved:.2f}s head start")
+            return speculation
+        speculation.cancel()
+        self.misses += 1
+        return None
+
+    def _cancel_locked(self):
+        if self.current:
+            self.current.cancel()
+            self.misses += 1
+            self.current = None
+
+    def cancel(self):
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+            self._cancel_locked()
+
+    def stats(self):
+        resolved = self.hits + self.misses
+        return {
+            "started": self.started,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / resolved if resolved else 0.0,
+            "latency_saved_total": self.latency_saved,
+            "latency_saved_avg": self.latency_saved / self.hits if self.hits else 0.0,
+        }
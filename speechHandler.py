@@ -2,86 +2,189 @@ import speech_recognition as sr
 import threading
 import queue
 import time
+from audioStream import get_shared_stream
+from workerPool import BoundedWorkerPool, OverflowPolicy
+from asrBackends import create_backend, GoogleBackend
+from noiseFloor import NoiseFloorEstimator
+from endpointer import AdaptiveEndpointer
+from audioPreprocess import AudioPreprocessor, audio_duration
 
 class SpeechHandler:
-    def __init__(self):
+    def __init__(self, audio_stream=None, backend=None, noise_estimator=None):
         self.recognizer = sr.Recognizer()
+        self.audio_stream = audio_stream or get_shared_stream()  # Shared long-lived mic capture
         
         # Optimize speech detection parameters
-        self.recognizer.pause_threshold = 1.0        # Wait 1 second of silence to mark end of phrase
-        self.recognizer.non_speaking_duration = 0.5  # Time of silence needed to mark end
-        self.recognizer.phrase_threshold = 0.3       # Minimum length of speaking to be considered a phrase
-        self.recognizer.energy_threshold = 1000      # Keep existing energy threshold
-        self.recognizer.dynamic_energy_adjustment_ratio = 1.5  # More sensitive to volume changes
-        self.recognizer.dynamic_energy_adjustment_damping = 0.15  # Smoother volume adaptation
+        self.endpointer = AdaptiveEndpointer(
+            min_silence=0.25,  # Short commands end after a quarter second of silence
+            max_silence=1.0,   # Long utterances still get the old one second window
+            pre_roll=0.5,      # Audio kept from before speech started
+            min_phrase=0.3     # Minimum length of speaking to be considered a phrase
+        )
         
+        # Thresholds follow the continuously measured room noise instead of one calibration
+        self.noise_estimator = noise_estimator or NoiseFloorEstimator(self.audio_stream)
+        self.noise_estimator.attach(self.endpointer)
+
         self.is_listening = False
         self.audio_queue = queue.Queue()
         self.command_history = []
         self.max_history = 10
         self.result_callback = None
+        self.partial_callback = None  # Receives partial hypotheses from streaming backends
+        self.recognition_gate = None  # Returns False when audio should not go to the recognizer
+        self.wake_end_position = None  # Stream offset where the local spotter heard the wake word end
         
         # Add speech validation parameters
         self.min_audio_length = 0.3  # Minimum length of audio to process (seconds)
         self.min_text_length = 2     # Minimum length of recognized text
         self.noise_words = {'', ' ', 'um', 'uh', 'ah', 'eh'}  # Words to ignore
+        self.preprocessor = AudioPreprocessor()  # Trim, 16 kHz mono, normalize before upload
 
         self.last_processed_text = None  # Add this to prevent self-hearing
         self.last_process_time = time.time()
         self.min_time_between_commands = 1.0  # Minimum seconds between commands
+        self.coalesced = False  # Set when an UtteranceCoalescer merges fragments; quick follow-ups then pass
+
+        # Bounded recognition workers so noisy rooms can't spawn unbounded threads
+        self.recognition_workers = 2
+        self.recognition_queue_size = 3
+        self.overflow_policy = OverflowPolicy.COALESCE
+        self.recognition_pool = None
+
+        # Speech-to-text engine; Google stays the default, offline engines stream partials
+        if backend is None:
+            self.backend = GoogleBackend(self.recognizer)
+        else:
+            self.backend = create_backend(backend)
 
     def listen_in_background(self, callback):
         """Start continuous background listening"""
         self.result_callback = callback
         self.is_listening = True
+        self.recognition_pool = BoundedWorkerPool(
+            self._process_item,
+            num_workers=self.recognition_workers,
+            max_queue=self.recognition_queue_size,
+            overflow_policy=self.overflow_policy,
+            merge=self._merge_audio,
+            name="recognizer"
+        )
+        self.recognition_pool.start()
+        self.noise_estimator.start()
         
         def listen_loop():
-            with sr.Microphone() as source:
-                self.recognizer.dynamic_energy_threshold = True
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.3)
-                
+            with self.audio_stream.open_reader() as source:
                 while self.is_listening:
-                    try:
-                        # Add energy threshold to filter out silence
-                        if self.recognizer.energy_threshold < 1000:
-                            self.recognizer.energy_threshold = 1000
-                            
-                        audio = self.recognizer.listen(
-                            source,
-                            timeout=None,
-                            phrase_time_limit=None
+                    decoder = None
+                    if self.backend.streaming:
+                        # Decode while the phrase is still being captured; word timings count from here
+                        decoder = self.backend.start_utterance(
+                            source.SAMPLE_RATE, source.SAMPLE_WIDTH, self._emit_partial
                         )
+                        decoder.stream_position = source.position
+                        source.tap = decoder.feed
+                    try:
+                        audio = self.endpointer.capture(source)
                         
-                        # Process in separate thread if audio has content
+                        # Hand off to the recognition workers if audio has content
                         if audio and len(audio.frame_data) > 0:
-                            threading.Thread(
-                                target=self._process_audio,
-                                args=(audio,),
-                                daemon=True
-                            ).start()
+                            self.recognition_pool.submit((audio, decoder))
+                        elif not self.audio_stream.is_running:
+                            break  # Capture device went away and the buffer is drained
                             
                     except sr.WaitTimeoutError:
                         continue
+                    finally:
+                        source.tap = None
                         
         self.listen_thread = threading.Thread(target=listen_loop, daemon=True)
         self.listen_thread.start()
 
-    def _process_audio(self, audio):
+    def _merge_audio(self, older, newer):
+        """Coalesce two queued phrases into one recognition request"""
+        older_audio, newer_audio = older[0], newer[0]
+        if (older_audio.sample_rate != newer_audio.sample_rate or
+                older_audio.sample_width != newer_audio.sample_width):
+            return newer
+        # The merged phrase is re-decoded in one pass, so per-phrase decoders are dropped
+        merged = sr.AudioData(older_audio.frame_data + newer_audio.frame_data,
+                              older_audio.sample_rate, older_audio.sample_width)
+        return (merged, None)
+
+    def _emit_partial(self, text):
+        if self.recognition_gate and not self.recognition_gate():
+            return
+        if self.partial_callback:
+            self.partial_callback(text.lower())
+
+    def _process_item(self, item):
+        audio, decoder = item
+        self._process_audio(audio, decoder)
+
+    def get_recognition_stats(self):
+        """Queued/dropped/in-flight counters for the recognition workers"""
+        if not self.recognition_pool:
+            return {}
+        return self.recognition_pool.stats()
+
+    def mark_wake_end(self, stream_position):
+        """Remember where the wake word ended so the same phrase can carry the command"""
+        self.wake_end_position = stream_position
+
+    def _wake_offset(self, audio, origin=None):
+        """Seconds after `origin` (default: the start of `audio`) at which a spotted wake word ended, or None"""
+        start = getattr(audio, "stream_position", None)
+        if start is None or self.wake_end_position is None:
+            return None
+        if not 0 < self.wake_end_position - start <= len(audio.frame_data):
+            return None
+        offset = self.wake_end_position - (start if origin is None else origin)
+        self.wake_end_position = None
+        return offset / float(audio.sample_rate * audio.sample_width)
+
+    def _audio_after(self, audio, offset):
+        start = int(offset * audio.sample_rate) * audio.sample_width
+        return sr.AudioData(audio.frame_data[start:], audio.sample_rate, audio.sample_width)
+
+    def _process_audio(self, audio, decoder=None):
         """Process audio with better validation"""
         try:
             current_time = time.time()
-            if current_time - self.last_process_time < self.min_time_between_commands:
+            if (not self.coalesced and
+                    current_time - self.last_process_time < self.min_time_between_commands):
                 return None
 
             # Check audio length
-            if len(audio.frame_data) / 32000 < self.min_audio_length:  # 16000 Hz * 2 bytes per sample
+            if audio_duration(audio) < self.min_audio_length:
+                return None
+
+            # Skip the cloud round trip entirely until the local wake word spotter fires
+            if self.recognition_gate and not self.recognition_gate():
                 return None
 
-            text = self.recognizer.recognize_google(audio).lower().strip()
+            # "hey bot what time is it": keep only what follows the wake word
+            if decoder is not None:
+                # The decoder started before the wait for speech, so its clock starts earlier than the phrase
+                wake_offset = self._wake_offset(audio, decoder.stream_position)
+                text = decoder.finish()
+                if wake_offset is not None and decoder.words:
+                    text = " ".join(word["word"] for word in decoder.words
+                                    if word["start"] >= wake_offset - 0.05)
+            else:
+                wake_offset = self._wake_offset(audio)
+                if wake_offset is not None:
+                    audio = self._audio_after(audio, wake_offset)
+                # Smaller payload, and clips that are only silence never leave the machine
+                audio = self.preprocessor.process(audio)
+                if audio_duration(audio) < self.min_audio_length:
+                    return None
+                text = self.backend.recognize(audio)
+            text = text.lower().strip()
             
             # Prevent processing duplicate/self-heard commands
             if (text and 
-                text != self.last_processed_text and 
+                (self.coalesced or text != self.last_processed_text) and 
                 len(text) >= self.min_text_length and 
                 text not in self.noise_words and 
                 not text.isspace()):
@@ -105,3 +208,5 @@ class SpeechHandler:
         self.is_listening = False
         if hasattr(self, 'listen_thread'):
             self.listen_thread.join(timeout=1)
+        if self.recognition_pool:
+            self.recognition_pool.stop()
@@ -0,0 +1,50 @@
+import json
+import re
+
+STEP_LIST_INSTRUCTIONS = (
+    "You are ThinkBot, guiding the user through a task out loud. Reply ONLY with JSON of the form "
+    '{"title": "<short task name>", "steps": ["<step>", ...]}. '
+    "Use 3 to 10 steps. Each step is one or two short spoken sentences with no numbering, "
+    "markdown or emojis."
+)
+
+# Spoken navigation while a guide is running
+NEXT_PHRASES = ["next", "next step", "continue", "done", "got it", "go on", "what's next", "and then"]
+BACK_PHRASES = ["go back", "back", "previous", "previous step", "last step", "step back"]
+REPEAT_PHRASES = ["repeat", "again", "say that again", "what was that", "come again", "pardon"]
+STOP_PHRASES = ["stop the steps", "cancel", "quit", "exit", "never mind", "stop guiding", "that's enough"]
+
+
+def step_list_messages(task):
+    return [
+        {"role": "system", "content": STEP_LIST_INSTRUCTIONS},
+        {"role": "user", "content": task},
+    ]
+
+
+def parse_step_list(text):
+    """Return (title, steps) from the model's reply; JSON first, numbered lines as a fallback"""
+    match = re.search(r"\{.*\}", text, re.DOTALL)
+    if match:
+        try:
+            data = json.loads(match.group(0))
+            steps = [str(step).strip() for step in data.get("steps", []) if str(step).strip()]
+            if steps:
+                return str(data.get("title", "")).strip(), steps
+        except ValueError:
+            pass
+
+    steps = []
+    for line in text.splitlines():
+        line = re.sub(r"^\s*(?:step\s*)?\d+[.):-]?\s*|^\s*[-*]\s+", "", line, flags=re.IGNORECASE).strip()
+        if line and not line.startswith(("{", "}")):
+            steps.append(line.replace("*", ""))
+    return "", steps
+
+
+def describe_step(steps, index):
+    """Spoken form of one step"""
+    text = f"Step {index + 1} of {len(steps)}: {steps[index]}"
+    if index == len(steps) - 1:
+        return text + " That's the last step."
+    return text
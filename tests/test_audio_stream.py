@@ -0,0 +1,36 @@
+from audioStream import AudioRingBuffer, StreamReader
+
+
+class _Stream:
+    """Just enough of SharedAudioStream for a reader over a hand-filled ring"""
+    sample_rate, sample_width, chunk_size, lossless = 16000, 2, 4, False
+
+    def __init__(self, capacity):
+        self.buffer = AudioRingBuffer(capacity)
+
+    def wait_for(self, position, timeout=None):
+        return self.buffer.write_pos >= position
+
+
+def test_read_view_is_zero_copy():
+    stream = _Stream(16)
+    stream.buffer.write(bytes(range(8)))
+    view = StreamReader(stream, start_pos=0).read_view(4)
+    assert isinstance(view, memoryview) and view.obj is stream.buffer._data
+    assert bytes(view) == bytes(range(8))
+
+
+def test_read_view_gathers_wrapped_chunks():
+    stream = _Stream(16)
+    stream.buffer.write(bytes(12))
+    stream.buffer.write(bytes(range(1, 9)))  # Wraps: 4 bytes at the end, 4 at the start
+    reader = StreamReader(stream, start_pos=12)
+    assert bytes(reader.read_view(4)) == bytes(range(1, 9))
+    assert reader.position == 20
+
+
+def test_read_matches_read_view():
+    stream = _Stream(16)
+    stream.buffer.write(bytes(range(10)))
+    first, second = StreamReader(stream, start_pos=2), StreamReader(stream, start_pos=2)
+    assert first.read(4) == bytes(second.read_view(4))
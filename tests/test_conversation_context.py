@@ -0,0 +1,38 @@
+from conversationContext import ConversationContext, is_follow_up
+from responseCache import ResponseCache
+
+
+def test_follow_up_detection():
+    assert is_follow_up("how old is he")
+    assert is_follow_up("tell me more")
+    assert not is_follow_up("tell me about paris")
+
+
+def test_same_question_hits_cache_on_next_turn():
+    conversation = ConversationContext()
+    cache = ResponseCache()
+    question = "tell me about paris"
+
+    key = cache.make_key(question, "model", conversation.cache_scope(question))
+    assert cache.get(key) is None
+    cache.put(key, "Paris is the capital of France.")
+    conversation.add_turn(question, "Paris is the capital of France.")
+
+    key = cache.make_key(question, "model", conversation.cache_scope(question))
+    assert cache.get(key) == "Paris is the capital of France."
+
+
+def test_follow_up_scoped_by_last_exchange():
+    conversation = ConversationContext()
+    conversation.add_turn("who is the president of france", "Emmanuel Macron.")
+    after_france = conversation.cache_scope("how old is he")
+    conversation.add_turn("who is the president of brazil", "Lula da Silva.")
+    assert conversation.cache_scope("how old is he") != after_france
+
+
+def test_summary_cache_is_bounded():
+    conversation = ConversationContext(max_tokens=40, summary_cache_size=3)
+    for index in range(30):
+        conversation.add_turn(f"question number {index} about something", f"Answer number {index}.")
+    assert conversation.summaries_built > 3
+    assert len(conversation.summary_cache) <= 3
@@ -0,0 +1,27 @@
+import numpy as np
+from echoCanceller import EchoCanceller, transcript_is_echo
+
+RATE = 16000
+
+
+def test_own_sentence_is_echo():
+    spoken = "The capital of France is Paris, a city on the Seine."
+    assert transcript_is_echo("the capital of france is paris", spoken)
+    assert transcript_is_echo("capital of france is parents a city", spoken)  # Misrecognized words
+
+
+def test_user_speech_is_not_echo():
+    spoken = "The capital of France is Paris, a city on the Seine."
+    assert not transcript_is_echo("what is the weather tomorrow", spoken)
+    assert not transcript_is_echo("stop", "Say stop when you want me to stop.")
+    assert transcript_is_echo("hello", "Hello!")
+
+
+def test_chunks_are_attenuated_until_the_delay_locks():
+    canceller = EchoCanceller()
+    rng = np.random.default_rng(0)
+    canceller.start_reference(rng.standard_normal(RATE).astype(np.float32) * 0.3, RATE)
+    mic = (rng.standard_normal(1024) * 8000).astype("<i2")
+    out = np.frombuffer(canceller.process(mic.tobytes(), RATE, 2), dtype="<i2")
+    assert canceller.delay is None
+    assert np.abs(out).max() < np.abs(mic).max() * 0.1
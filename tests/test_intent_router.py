@@ -0,0 +1,50 @@
+from intentRouter import (IntentRouter, whole_utterance, TIME_REQUESTS, DATE_REQUESTS, STATUS_REQUESTS,
+                          IDENTITY_REQUESTS)
+
+
+def _router():
+    # Same triggers as ThinkBot._build_intent_router, with fixed replies
+    router = IntentRouter()
+    router.register("time", ["what time", "the time", "time is it"],
+                    whole_utterance(TIME_REQUESTS, lambda text, match: "TIME"))
+    router.register("date", ["what day", "what date", "the date", "today's date", "what's the date",
+                             "day is it", "day is today"],
+                    whole_utterance(DATE_REQUESTS, lambda text, match: "DATE"))
+    router.register("status", ["how are you", "how do you feel", "how are you feeling",
+                               "status report", "your status"],
+                    whole_utterance(STATUS_REQUESTS, lambda text, match: "STATUS"))
+    router.register("identity", ["who are you", "your name", "what are you"],
+                    whole_utterance(IDENTITY_REQUESTS, lambda text, match: "IDENTITY"))
+    router.register("query", ["what is", "why", "how"])
+    return router
+
+
+def _reply(text):
+    return _router().route(text)[1]
+
+
+def test_whole_requests_answer_locally():
+    assert _reply("what time is it") == "TIME"
+    assert _reply("What's the time?") == "TIME"
+    assert _reply("what's the date") == "DATE"
+    assert _reply("what day is it today") == "DATE"
+    assert _reply("how are you") == "STATUS"
+    assert _reply("who are you") == "IDENTITY"
+    assert _reply("what's your name please") == "IDENTITY"
+
+
+def test_questions_containing_triggers_go_to_the_llm():
+    assert _reply("what time does the super bowl start") is None
+    assert _reply("what time zone is tokyo in") is None
+    assert _reply("what time does the store close") is None
+    assert _reply("what day is christmas") is None
+    assert _reply("how are you able to hear me") is None
+    assert _reply("what are you able to do") is None
+    assert _reply("what is your name for the cat") is None
+
+
+def test_trigger_phrases_need_word_boundaries():
+    router = IntentRouter()
+    router.register("greeting", ["hi"])
+    assert router.classify("this is it") is None
+    assert router.classify("hi there").intent == "greeting"
@@ -0,0 +1,36 @@
+import pytest
+from groqClient import GroqConnectionPool
+from mockGroqServer import start_mock_server
+from rateLimiter import Priority
+
+
+@pytest.fixture
+def pool():
+    server = start_mock_server(latency="fixed:0", chunk_interval="fixed:0",
+                               script={"doctor": "Dr. Smith said hello. Then he left."})
+    pool = GroqConnectionPool("test-key", base_url=server.base_url)
+    yield pool
+    server.shutdown()
+
+
+def _chat(pool, **kwargs):
+    return pool.chat(Priority.INTERACTIVE, messages=[{"role": "user", "content": "the doctor"}],
+                     model="llama3-8b-8192", **kwargs)
+
+
+def test_stop_sequence_finishes_with_stop(pool):
+    choice = _chat(pool, stop=["! ", ". "]).choices[0]
+    assert choice.message.content == "Dr"
+    assert choice.finish_reason == "stop"
+
+
+def test_max_tokens_finishes_with_length(pool):
+    choice = _chat(pool, max_tokens=3).choices[0]
+    assert choice.message.content == "Dr. Smith sa"
+    assert choice.finish_reason == "length"
+
+
+def test_streamed_truncation_reports_length(pool):
+    chunks = list(_chat(pool, max_tokens=3, stream=True))
+    assert "".join(chunk.choices[0].delta.content or "" for chunk in chunks) == "Dr. Smith sa"
+    assert chunks[-1].choices[0].finish_reason == "length"
@@ -0,0 +1,42 @@
+import threading
+import time
+from responseCache import ResponseCache
+
+
+def _concurrent(cache, ttl, callers=4):
+    computes = []
+
+    def compute():
+        computes.append(1)
+        time.sleep(0.2)
+        return "It's 3 PM."
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_compute("key", compute, ttl)))
+               for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return computes, results
+
+
+def test_concurrent_misses_make_one_call():
+    computes, results = _concurrent(ResponseCache(), ttl=60)
+    assert len(computes) == 1
+    assert all(value == "It's 3 PM." for value, _ in results)
+
+
+def test_uncacheable_result_still_reaches_waiters():
+    cache = ResponseCache()
+    computes, results = _concurrent(cache, ttl=0)
+    assert len(computes) == 1
+    assert all(value == "It's 3 PM." for value, _ in results)
+    assert cache.get("key") is None
+
+
+def test_abandoned_leader_lets_a_waiter_lead():
+    cache = ResponseCache()
+    assert cache.lookup_or_lead("key") == (None, True)
+    threading.Timer(0.05, cache.abandon, args=("key",)).start()
+    assert cache.lookup_or_lead("key", timeout=1.0) == (None, True)
@@ -0,0 +1,34 @@
+from semanticCache import SemanticCache, words_match
+
+
+def test_stems_match():
+    assert words_match("invented", "inventor")
+    assert words_match("invention", "invented")
+
+
+def test_numbers_match_exactly():
+    assert not words_match("2014", "2018")
+    assert not words_match("12", "120")
+
+
+def test_similar_spelling_is_not_a_stem():
+    assert not words_match("austria", "australia")
+
+
+def test_paraphrase_hits():
+    cache = SemanticCache()
+    cache.put("who invented the telephone", "Alexander Graham Bell.")
+    hit = cache.lookup("tell me who the inventor of the telephone is")
+    assert hit and hit[0] == "Alexander Graham Bell."
+
+
+def test_different_year_misses():
+    cache = SemanticCache()
+    cache.put("who won the world cup in 2014", "Germany.")
+    assert cache.lookup("who won the world cup in 2018") is None
+
+
+def test_different_country_misses():
+    cache = SemanticCache()
+    cache.put("capital of australia", "Canberra.")
+    assert cache.lookup("capital of austria") is None
@@ -0,0 +1,52 @@
+import time
+from speculativeResponder import SpeculativeResponder, same_request
+
+
+def test_filler_differences_match():
+    assert same_request("what is the capital of france", "um what's the capital of france")
+
+
+def test_numbers_must_match():
+    assert not same_request("what is 12 times 13", "what is 12 times 14")
+    assert not same_request("set a timer for 5 minutes", "set a timer for 15 minutes")
+    assert not same_request("who was the 16th president", "who was the 17th president")
+
+
+def test_numbers_must_match_in_order():
+    assert not same_request("divide 10 by 2", "divide 2 by 10")
+
+
+def test_no_content_words_never_match():
+    assert not same_request("what is this", "what is that")
+    assert not same_request("can you tell me", "what do you know")
+
+
+def test_extra_content_word_misses():
+    assert not same_request("weather in paris", "weather in paris tomorrow")
+
+
+def _answer(text):
+    yield f"Answer to {text}."
+
+
+def _responder():
+    return SpeculativeResponder(_answer, stable_time=0.01)
+
+
+def _speculate(responder, text):
+    responder.on_partial(text)
+    time.sleep(0.1)
+
+
+def test_claim_matching_final():
+    responder = _responder()
+    _speculate(responder, "what is 12 times 13")
+    speculation = responder.claim("what is 12 times 13")
+    assert speculation and list(speculation.sentences()) == ["Answer to what is 12 times 13."]
+
+
+def test_claim_rejects_different_number():
+    responder = _responder()
+    _speculate(responder, "what is 12 times 13")
+    assert responder.claim("what is 12 times 14") is None
+    assert responder.stats()["misses"] == 1
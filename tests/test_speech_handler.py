@@ -0,0 +1,48 @@
+import speech_recognition as sr
+from asrBackends import FakeBackend
+from audioStream import SharedAudioStream
+from speechHandler import SpeechHandler
+
+RATE, WIDTH = 16000, 2
+
+
+def _handler(transcripts, coalesced):
+    handler = SpeechHandler(SharedAudioStream(), backend=FakeBackend(transcripts))
+    handler.coalesced = coalesced
+    handler.last_process_time = 0
+    heard = []
+    handler.result_callback = heard.append
+    return handler, heard
+
+
+def _phrase(handler, seconds=1.0):
+    audio = sr.AudioData(b"\x10\x00" * int(RATE * seconds), RATE, WIDTH)
+    decoder = handler.backend.start_utterance(RATE, WIDTH)
+    decoder.feed(audio.frame_data)
+    return audio, decoder
+
+
+def test_quick_fragments_reach_the_coalescer():
+    handler, heard = _handler(["set a timer", "for five minutes"], coalesced=True)
+    handler._process_audio(*_phrase(handler))
+    handler._process_audio(*_phrase(handler))
+    assert heard == ["set a timer", "for five minutes"]
+
+
+def test_cooldown_still_applies_without_a_coalescer():
+    handler, heard = _handler(["set a timer", "for five minutes"], coalesced=False)
+    handler._process_audio(*_phrase(handler))
+    handler._process_audio(*_phrase(handler))
+    assert heard == ["set a timer"]
+
+
+def test_wake_words_dropped_when_decoder_started_before_the_phrase():
+    handler, heard = _handler(["hey bot set a timer"], coalesced=True)  # Words every 1/3 s of decoder time
+    decoder = handler.backend.start_utterance(RATE, WIDTH)
+    decoder.stream_position = 0
+    decoder.feed(b"\x00\x00" * RATE * 2)  # The leading wait for speech is fed too
+    audio = sr.AudioData(b"\x10\x00" * RATE * 2, RATE, WIDTH)
+    audio.stream_position = RATE * WIDTH // 2  # Phrase (with pre-roll) starts 0.5 s after the decoder
+    handler.mark_wake_end(int(RATE * WIDTH * 0.65))  # Spotter: "bot" ends 0.65 s after the decoder
+    handler._process_audio(audio, decoder)
+    assert heard == ["set a timer"]
@@ -0,0 +1,77 @@
+import time
+import numpy as np
+from audioStream import SharedAudioStream
+from wakeWordSpotter import WakeWordSpotter, enroll, write_wav
+
+RATE = 16000
+
+
+def _sweep(start_hz, end_hz, seconds=0.6):
+    t = np.arange(int(RATE * seconds)) / RATE
+    phase = 2 * np.pi * (start_hz * t + (end_hz - start_hz) * t * t / (2 * seconds))
+    return 0.5 * np.sin(phase)
+
+
+def _pcm(samples):
+    return (np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes()
+
+
+def _in_silence(samples, seed):
+    noise = np.random.default_rng(seed).standard_normal
+    return np.concatenate((noise(RATE) * 0.003, samples + noise(len(samples)) * 0.003, noise(RATE) * 0.003))
+
+
+def _spotter(tmp_path):
+    # Synthetic fixture: a rising chirp stands in for the enrolled wake word
+    write_wav(str(tmp_path / "chirp.wav"), _pcm(_in_silence(_sweep(300, 3000), seed=1)), RATE)
+    spotter = WakeWordSpotter(template_dir=str(tmp_path))
+    spotter.refractory_time = 0
+    return spotter
+
+
+def test_templates_load_from_directory(tmp_path):
+    assert _spotter(tmp_path).is_ready
+    assert not WakeWordSpotter(template_dir=str(tmp_path / "missing")).is_ready
+
+
+def test_chirp_is_detected(tmp_path):
+    detection = _spotter(tmp_path).detect(_pcm(_in_silence(_sweep(300, 3000), seed=2)), RATE)
+    assert detection is not None
+    assert RATE * 1.4 < detection.end_sample < RATE * 2.0  # Ends with the chirp, not the recording
+
+
+def test_different_sweep_is_rejected(tmp_path):
+    assert _spotter(tmp_path).detect(_pcm(_in_silence(_sweep(3000, 300), seed=3)), RATE) is None
+
+
+class _ScriptedMic:
+    """Microphone stand-in that plays fixed PCM a little faster than real time"""
+    SAMPLE_RATE, SAMPLE_WIDTH, CHUNK = RATE, 2, 1024
+
+    def __init__(self, data):
+        self.data = data
+        self.offset = 0
+        self.stream = self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def read(self, frames):
+        time.sleep(frames / RATE / 4)
+        chunk = self.data[self.offset:self.offset + frames * 2]
+        self.offset += len(chunk)
+        return chunk
+
+
+def test_enroll_records_usable_templates(tmp_path):
+    takes = [_in_silence(_sweep(300, 3000), seed=seed) for seed in (4, 5)]
+    mic = _ScriptedMic(_pcm(np.concatenate(takes)))
+    stream = SharedAudioStream(source_factory=lambda: mic, lossless=True)
+    paths = enroll(stream, takes=2, directory=str(tmp_path), prompt=lambda message: None)
+    assert len(paths) == 2
+    spotter = WakeWordSpotter(template_dir=str(tmp_path))
+    assert len(spotter.templates) == 2
+    assert spotter.detect(_pcm(_in_silence(_sweep(300, 3000), seed=6)), RATE) is not None
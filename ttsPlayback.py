@@ -0,0 +1,73 @@
+import collections
+import os
+import tempfile
+import threading
+import time
+import pygame
+from echoCanceller import transcript_is_echo
+from wakeWordSpotter import read_wav
+
+
+class TTSPlayer:
+    """Plays synthesized speech through pygame so the echo canceller knows the exact output"""
+    def __init__(self, echo_canceller):
+        self.echo_canceller = echo_canceller
+        self.available = True  # Cleared if this machine can't render TTS to a file
+        self.channel = None
+        self._stop_event = threading.Event()
+        self.recent = collections.deque(maxlen=4)  # [text, finished time or None while playing]
+        self.echo_window = 3.0  # Seconds after playback that a transcript may still be our own echo
+        self.temp_dir = tempfile.mkdtemp(prefix="thinkbot_tts_")
+
+    @property
+    def is_playing(self):
+        return self.channel is not None and self.channel.get_busy()
+
+    def _render(self, text, engine):
+        path = os.path.join(self.temp_dir, "utterance.wav")
+        engine.save_to_file(text, path)
+        engine.runAndWait()
+        samples, rate = read_wav(path)
+        if not pygame.mixer.get_init():  # Learning mode may have shut pygame down
+            pygame.mixer.init()
+        return pygame.mixer.Sound(path), samples, rate
+
+    def speak(self, text, engine):
+        """Play `text` and block until done or interrupted; False means use the plain engine"""
+        if not self.available:
+            return False
+        try:
+            sound, samples, rate = self._render(text, engine)
+        except Exception as e:
+            print(f"Echo-referenced playback unavailable, using direct TTS: {e}")
+            self.available = False
+            return False
+
+        self._stop_event.clear()
+        played = [text, None]
+        self.recent.append(played)
+        try:
+            self.echo_canceller.start_reference(samples, rate)
+            self.channel = sound.play()
+            while self.channel.get_busy() and not self._stop_event.is_set():
+                time.sleep(0.02)
+
+            if self._stop_event.is_set():
+                self.channel.stop()
+                self.echo_canceller.stop_reference()
+        finally:
+            played[1] = time.time()
+        return True
+
+    def recently_said(self, transcript):
+        """Does `transcript` match what we are playing, or played a moment ago?"""
+        now = time.time()
+        return any(
+            transcript_is_echo(transcript, text)
+            for text, finished in list(self.recent)
+            if finished is None or now - finished < self.echo_window
+        )
+
+    def stop(self):
+        """Cut playback short, e.g. when the user starts talking over the bot"""
+        self._stop_event.set()
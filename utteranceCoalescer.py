@@ -0,0 +1,117 @@
+import logging
+import threading
+import time
+
+# A phrase ending in one of these almost certainly continues
+INCOMPLETE_ENDINGS = {
+    "and", "or", "but", "so", "because", "if", "then", "that", "the", "a", "an", "of", "to", "for",
+    "with", "in", "on", "at", "about", "from", "is", "are", "was", "what", "how", "why", "who",
+    "where", "when", "which", "my", "your", "me", "um", "uh", "like",
+}
+
+
+class UtteranceCoalescer:
+    """Merges speech fragments that arrive in quick succession into one request
+
+    Each final transcript opens a short window; another fragment inside it is
+    appended instead of being dispatched separately. A fragment that arrives
+    shortly after dispatch cancels the in-flight reply and is re-dispatched
+    together with it. The window grows when continuations arrive late and
+    slowly shrinks back while they don't.
+    """
+    def __init__(self, dispatch, cancel=None, window=0.6, min_window=0.3, max_window=1.5,
+                 continuation_window=2.0, decay=0.97):
+        self.dispatch = dispatch          # fn(text) - handles one whole utterance
+        self.cancel = cancel              # fn() - abandon the reply in flight
+        self.window = window              # Current adaptive wait after a complete-sounding fragment
+        self.min_window = min_window
+        self.max_window = max_window
+        self.continuation_window = continuation_window  # How long after dispatch a fragment still belongs to it
+        self.decay = decay
+        self.pending = []
+        self.last_fragment_time = 0.0
+        self.in_flight = None             # (text, dispatch time)
+        self._timer = None
+        self._lock = threading.Lock()
+        self._dispatch_lock = threading.Lock()  # One utterance handled at a time
+
+        # Stats
+        self.fragments = 0
+        self.merged = 0
+        self.dispatched = 0
+        self.cancelled_in_flight = 0
+
+    def wait_for(self, text):
+        """How long to hold `text` for a continuation"""
+        words = text.split()
+        if words and words[-1] in INCOMPLETE_ENDINGS:
+            return self.max_window
+        if len(words) <= 2:
+            return min(self.max_window, self.window * 1.5)
+        return self.window
+
+    def submit(self, text):
+        """Speech callback: queue a final transcript fragment"""
+        text = text.strip()
+        if not text:
+            return
+        now = time.time()
+        cancel_in_flight = False
+        with self._lock:
+            self.fragments += 1
+            if self._timer:
+                self._timer.cancel()
+            if self.pending:
+                self.merged += 1
+            elif self.in_flight and now - self.in_flight[1] < self.continuation_window:
+                # Dispatched too early - take the utterance back and wait longer next time
+                previous, _ = self.in_flight
+                self.pending.append(previous)
+                self.in_flight = None
+                self.merged += 1
+                self.cancelled_in_flight += 1
+                self.window = min(self.max_window, max(self.window, (now - self.last_fragment_time) * 1.2))
+                cancel_in_flight = True
+            self.pending.append(text)
+            self.last_fragment_time = now
+            self._timer = threading.Timer(self.wait_for(" ".join(self.pending)), self._flush)
+            self._timer.daemon = True
+            self._timer.start()
+        if cancel_in_flight:
+            logging.info("Continuation arrived, cancelling the reply in flight")
+            if self.cancel:
+                self.cancel()
+
+    def _flush(self):
+        with self._lock:
+            if not self.pending:
+                return
+            text = " ".join(self.pending)
+            self.pending = []
+            self._timer = None
+            self.in_flight = (text, time.time())
+            self.window = max(self.min_window, self.window * self.decay)
+            self.dispatched += 1
+        with self._dispatch_lock:
+            try:
+                self.dispatch(text)
+            finally:
+                with self._lock:
+                    if self.in_flight and self.in_flight[0] == text:
+                        self.in_flight = None
+
+    def flush(self):
+        """Dispatch whatever is pending right now"""
+        with self._lock:
+            if self._timer:
+                self._timer.cancel()
+        self._flush()
+
+    def stats(self):
+        return {
+            "fragments": self.fragments,
+            "merged": self.merged,
+            "dispatched": self.dispatched,
+            "cancelled_in_flight": self.cancelled_in_flight,
+            "window": self.window,
+        }
@@ -0,0 +1,380 @@
+import os
+import re
+import glob
+import wave
+import argparse
+import threading
+import time
+import numpy as np
+import speech_recognition as sr
+from audioStream import get_shared_stream
+from endpointer import AdaptiveEndpointer
+from noiseFloor import NoiseFloorEstimator
+
+# Enrolled recordings of the wake word ("hey bot"), one utterance per WAV file
+DEFAULT_TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "wake_templates")
+
+
+def contains_wake_phrase(text, phrases):
+    """Whole-word wake phrase check so 'this' or 'think' never counts as 'hi'"""
+    for phrase in phrases:
+        if re.search(r"\b" + re.escape(phrase) + r"\b", text):
+            return True
+    return False
+
+
+def split_wake_phrase(text, phrases):
+    """Split "hey bot what time is it" into ("hey bot", "what time is it")
+
+    Longer phrases win over their prefixes ("hey bot" over "hey"), and the
+    earliest match in the utterance is used. Returns (None, text) if no wake
+    phrase is present.
+    """
+    best = None
+    for phrase in phrases:
+        match = re.search(r"\b" + re.escape(phrase) + r"\b", text)
+        if match and (best is None or match.start() < best.start() or
+                      (match.start() == best.start() and match.end() > best.end())):
+            best = match
+    if best is None:
+        return None, text
+    return best.group(0), text[best.end():].strip(" ,.!?")
+
+
+def pcm_to_float(data, sample_width=2):
+    """Convert little-endian PCM bytes to float32 samples in [-1, 1]"""
+    if sample_width == 2:
+        return np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0
+    if sample_width == 4:
+        return np.frombuffer(data, dtype="<i4").astype(np.float32) / 2147483648.0
+    if sample_width == 1:
+        return (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    raise ValueError(f"Unsupported sample width: {sample_width}")
+
+
+def read_wav(path):
+    """Load a mono/stereo WAV file as (float32 mono samples, sample_rate)"""
+    with wave.open(path, "rb") as wav_file:
+        rate = wav_file.getframerate()
+        width = wav_file.getsampwidth()
+        channels = wav_file.getnchannels()
+        samples = pcm_to_float(wav_file.readframes(wav_file.getnframes()), width)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples, rate
+
+
+def write_wav(path, frame_data, sample_rate, sample_width=2):
+    """Save mono PCM bytes as a WAV file"""
+    with wave.open(path, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(sample_width)
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(frame_data)
+
+
+class MFCCExtractor:
+    """Vectorized MFCC front end with cached filterbanks"""
+    def __init__(self, sample_rate=16000, n_mfcc=13, n_mels=26, frame_ms=25, hop_ms=10):
+        self.sample_rate = sample_rate
+        self.n_mfcc = n_mfcc
+        self.frame_length = int(sample_rate * frame_ms / 1000)
+        self.hop_length = int(sample_rate * hop_ms / 1000)
+        self.n_fft = 1 << (self.frame_length - 1).bit_length()
+        self.window = np.hamming(self.frame_length).astype(np.float32)
+        self.mel_filters = self._mel_filterbank(n_mels)
+        self.dct = self._dct_matrix(n_mels, n_mfcc)
+
+    def _mel_filterbank(self, n_mels):
+        def hz_to_mel(hz):
+            return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+        def mel_to_hz(mel):
+            return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+
+        mel_points = np.linspace(hz_to_mel(0), hz_to_mel(self.sample_rate / 2), n_mels + 2)
+        bins = np.floor((self.n_fft + 1) * mel_to_hz(mel_points) / self.sample_rate).astype(int)
+        filters = np.zeros((n_mels, self.n_fft // 2 + 1), dtype=np.float32)
+        for m in range(1, n_mels + 1):
+            left, center, right = bins[m - 1], bins[m], bins[m + 1]
+            if center > left:
+                filters[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+            if right > center:
+                filters[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+        return filters
+
+    def _dct_matrix(self, n_mels, n_mfcc):
+        n = np.arange(n_mels)
+        k = np.arange(n_mfcc)[:, None]
+        return (np.cos(np.pi * k * (2 * n + 1) / (2 * n_mels)) * np.sqrt(2.0 / n_mels)).astype(np.float32)
+
+    def frame_count(self, n_samples):
+        if n_samples < self.frame_length:
+            return 0
+        return 1 + (n_samples - self.frame_length) // self.hop_length
+
+    def compute(self, samples):
+        """Return (frames, n_mfcc) MFCCs and per-frame log energy"""
+        count = self.frame_count(len(samples))
+        if count == 0:
+            return np.zeros((0, self.n_mfcc), dtype=np.float32), np.zeros(0, dtype=np.float32)
+
+        emphasized = np.append(samples[0], samples[1:] - 0.97 * samples[:-1]).astype(np.float32)
+        frames = np.lib.stride_tricks.sliding_window_view(emphasized, self.frame_length)[::self.hop_length][:count]
+        spectrum = np.abs(np.fft.rfft(frames * self.window, n=self.n_fft)) ** 2 / self.n_fft
+        mel_energy = np.log(spectrum @ self.mel_filters.T + 1e-10)
+        log_energy = np.log(np.sum(frames ** 2, axis=1) + 1e-10)
+        return mel_energy @ self.dct.T, log_energy
+
+
+def dtw_distance(template, query, band=None):
+    """Length-normalized DTW cost between two feature sequences"""
+    n, m = len(template), len(query)
+    if n == 0 or m == 0:
+        return np.inf
+
+    cost = np.sqrt(((template[:, None, :] - query[None, :, :]) ** 2).sum(axis=2))
+    band = max(band or max(n, m), abs(n - m) + 1)
+    acc = np.full((n + 1, m + 1), np.inf)
+    acc[0, 0] = 0.0
+    for i in range(1, n + 1):
+        centre = int(i * m / n)
+        lo, hi = max(1, centre - band), min(m, centre + band)
+        for j in range(lo, hi + 1):
+            acc[i, j] = cost[i - 1, j - 1] + min(acc[i - 1, j - 1], acc[i - 1, j], acc[i, j - 1])
+    return acc[n, m] / (n + m)
+
+
+class WakeDetection:
+    def __init__(self, score, end_sample, detected_at):
+        self.score = score
+        self.end_sample = end_sample  # Absolute sample index where the wake word ended
+        self.detected_at = detected_at
+        self.stream_position = None   # Byte offset of the wake word end in the shared stream
+
+
+class WakeWordSpotter:
+    """Streaming keyword spotter: MFCC features matched to enrolled templates with DTW"""
+    def __init__(self, template_dir=DEFAULT_TEMPLATE_DIR, sample_rate=16000, threshold=6.0):
+        self.sample_rate = sample_rate
+        self.threshold = threshold  # Max normalized DTW cost that counts as a match
+        self.check_interval = 3     # Frames (30 ms) between matching attempts
+        self.speech_margin = 2.0    # Log-energy above the noise floor that counts as speech
+        self.hangover_frames = 15   # Silent frames (150 ms) that end a voiced segment
+        self.refractory_time = 1.0  # Seconds to ignore after a detection
+        self.extractor = MFCCExtractor(sample_rate)
+        self.templates = []
+        self.detections = 0
+        self.is_running = False
+        self.spot_thread = None
+        self._reset_stream()
+        if template_dir and os.path.isdir(template_dir):
+            self.load_templates(template_dir)
+
+    @property
+    def is_ready(self):
+        return bool(self.templates)
+
+    def add_template(self, samples, sample_rate=None):
+        """Enroll one recording of the wake word"""
+        samples = self._resample(np.asarray(samples, dtype=np.float32), sample_rate or self.sample_rate)
+        features, log_energy = self.extractor.compute(samples)
+        if len(log_energy) == 0:
+            return False
+        voiced = log_energy > log_energy.min() + self.speech_margin
+        if voiced.any():  # Trim leading and trailing silence from the template
+            first, last = np.argmax(voiced), len(voiced) - np.argmax(voiced[::-1])
+            features = features[first:last]
+        if len(features) < 5:
+            return False
+        self.templates.append(self._normalize(features))
+        return True
+
+    def load_templates(self, directory):
+        """Enroll every WAV file in a directory"""
+        for path in sorted(glob.glob(os.path.join(directory, "*.wav"))):
+            samples, rate = read_wav(path)
+            self.add_template(samples, rate)
+        return len(self.templates)
+
+    def _normalize(self, features):
+        # Drop c0 (loudness) and remove the channel mean so mic gain doesn't matter
+        features = features[:, 1:]
+        return features - features.mean(axis=0)
+
+    def _resample(self, samples, rate):
+        if rate == self.sample_rate or len(samples) == 0:
+            return samples
+        target_length = int(len(samples) * self.sample_rate / rate)
+        positions = np.linspace(0, len(samples) - 1, target_length)
+        return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+    def _reset_stream(self):
+        self.pending = np.zeros(0, dtype=np.float32)
+        self.segment = []           # MFCC frames of the current voiced segment
+        self.silent_frames = 0
+        self.noise_floor = None
+        self.samples_seen = 0
+        self.frames_since_check = 0
+        self.last_detection_time = 0
+
+    def reset(self):
+        self._reset_stream()
+
+    def _track_segment(self, features, energies):
+        """Energy gate: collect frames belonging to the current voiced segment"""
+        for frame, energy in zip(features, energies):
+            if self.noise_floor is None:
+                self.noise_floor = float(energy)
+            if energy > self.noise_floor + self.speech_margin:
+                self.segment.append(frame)
+                self.silent_frames = 0
+            else:
+                # Floor falls quickly and rises slowly, and only learns from non-speech
+                self.noise_floor = min(float(energy), 0.99 * self.noise_floor + 0.01 * float(energy))
+                if self.segment:
+                    self.silent_frames += 1
+                    if self.silent_frames > self.hangover_frames:
+                        self.segment = []
+                    else:
+                        self.segment.append(frame)
+
+    def _score_segment(self):
+        """Best template cost for the voiced segment so far, or None if lengths don't fit"""
+        best = None
+        length = len(self.segment)
+        if length == 0:
+            return None
+        query = None
+        for template in self.templates:
+            if not 0.8 * len(template) <= length <= 1.5 * len(template):
+                continue
+            if query is None:
+                query = self._normalize(np.array(self.segment))
+            score = dtw_distance(template, query, band=len(template) // 3 + 5)
+            if best is None or score < best:
+                best = score
+        return best
+
+    def process(self, chunk, sample_rate=None, sample_width=2):
+        """Feed raw PCM; returns a WakeDetection when the wake word just ended"""
+        if not self.templates:
+            return None
+
+        samples = self._resample(pcm_to_float(chunk, sample_width), sample_rate or self.sample_rate)
+        self.samples_seen += len(samples)
+        self.pending = np.concatenate((self.pending, samples))
+
+        # Turn complete frames into features, keeping the overlap for the next chunk
+        count = self.extractor.frame_count(len(self.pending))
+        if count == 0:
+            return None
+        used = self.extractor.frame_length + (count - 1) * self.extractor.hop_length
+        features, energies = self.extractor.compute(self.pending[:used])
+        self.pending = self.pending[count * self.extractor.hop_length:]
+
+        detection = None
+        for start in range(0, count, self.check_interval):
+            stop = min(count, start + self.check_interval)
+            self._track_segment(features[start:stop], energies[start:stop])
+            detection = detection or self._check(count - stop)
+        return detection
+
+    def _check(self, frames_ahead):
+        now = time.time()
+        if now - self.last_detection_time < self.refractory_time:
+            return None
+
+        # Only spend DTW time while a voiced segment of a plausible length is open
+        score = self._score_segment()
+        if score is None or score > self.threshold:
+            return None
+
+        self.last_detection_time = now
+        self.detections += 1
+        self.segment = []
+        end_sample = self.samples_seen - len(self.pending) - frames_ahead * self.extractor.hop_length
+        return WakeDetection(score, end_sample, now)
+
+    def detect(self, data, sample_rate=None, sample_width=2, chunk_samples=1024):
+        """Run the streaming spotter over a complete recording"""
+        self.reset()
+        step = chunk_samples * sample_width
+        for start in range(0, len(data), step):
+            detection = self.process(data[start:start + step], sample_rate, sample_width)
+            if detection:
+                return detection
+        return None
+
+    def start(self, audio_stream, callback):
+        """Spot continuously on the shared capture stream in a background thread"""
+        if self.is_running or not self.templates:
+            return False
+        self.is_running = True
+
+        def spot_loop():
+            with audio_stream.open_reader() as source:
+                self.reset()
+                while self.is_running:
+                    chunk = source.read_view(source.CHUNK, timeout=0.5)  # Converted to float at once
+                    if not chunk:
+                        if not audio_stream.is_running:
+                            break
+                        continue
+                    detection = self.process(chunk, source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+                    if detection:
+                        # Map back to the capture stream so listeners can cut the wake word off
+                        samples_after = (self.samples_seen - detection.end_sample) * source.SAMPLE_RATE / self.sample_rate
+                        detection.stream_position = source.position - int(samples_after) * source.SAMPLE_WIDTH
+                        callback(detection)
+            self.is_running = False
+
+        self.spot_thread = threading.Thread(target=spot_loop, daemon=True)
+        self.spot_thread.start()
+        return True
+
+    def stop(self):
+        self.is_running = False
+        if self.spot_thread:
+            self.spot_thread.join(timeout=1)
+
+
+def enroll(audio_stream=None, takes=3, directory=DEFAULT_TEMPLATE_DIR, prompt=print):
+    """Record `takes` utterances of the wake word from the shared stream into template WAVs"""
+    audio_stream = audio_stream or get_shared_stream()
+    audio_stream.start()
+    os.makedirs(directory, exist_ok=True)
+    endpointer = AdaptiveEndpointer(min_silence=0.3, max_silence=0.6, pre_roll=0.1, min_phrase=0.2)
+    noise_estimator = NoiseFloorEstimator(audio_stream)
+    noise_estimator.attach(endpointer)
+    noise_estimator.start()
+    time.sleep(1.0)  # Let the estimator hear the room before the first take
+
+    paths = []
+    with audio_stream.open_reader() as source:
+        for take in range(1, takes + 1):
+            prompt(f"Say the wake word now ({take}/{takes})")
+            try:
+                audio = endpointer.capture(source, timeout=10, phrase_time_limit=2.5)
+            except sr.WaitTimeoutError:
+                prompt("Didn't hear anything, skipping this take")
+                continue
+            path = os.path.join(directory, f"wake_{int(time.time())}_{take}.wav")
+            write_wav(path, audio.frame_data, audio.sample_rate, audio.sample_width)
+            paths.append(path)
+    noise_estimator.stop()
+
+    spotter = WakeWordSpotter(template_dir=None)
+    usable = sum(spotter.add_template(*read_wav(path)) for path in paths)
+    prompt(f"Saved {len(paths)} recordings to {directory}, {usable} usable as templates")
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Wake word template tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    enroll_parser = commands.add_parser("enroll", help="Record wake word templates from the microphone")
+    enroll_parser.add_argument("--takes", type=int, default=5)
+    enroll_parser.add_argument("--dir", default=DEFAULT_TEMPLATE_DIR)
+    args = parser.parse_args()
+    enroll(takes=args.takes, directory=args.dir)
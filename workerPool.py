@@ -0,0 +1,121 @@
+import collections
+import threading
+from enum import Enum
+
+
+class OverflowPolicy(Enum):
+    DROP_OLDEST = "drop_oldest"  # Evict the stalest queued item to make room
+    DROP_NEWEST = "drop_newest"  # Reject the incoming item
+    COALESCE = "coalesce"        # Merge the incoming item into the newest queued one
+
+
+class BoundedWorkerPool:
+    """Fixed number of worker threads fed from a bounded queue"""
+    def __init__(self, handler, num_workers=2, max_queue=4,
+                 overflow_policy=OverflowPolicy.DROP_OLDEST, merge=None, name="worker"):
+        self.handler = handler
+        self.num_workers = num_workers
+        self.max_queue = max_queue
+        self.overflow_policy = OverflowPolicy(overflow_policy)
+        self.merge = merge  # merge(older, newer) -> item, required for COALESCE
+        self.name = name
+
+        self._queue = collections.deque()
+        self._condition = threading.Condition()
+        self._workers = []
+        self.is_running = False
+
+        # Counters
+        self.submitted = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+
+    def start(self):
+        with self._condition:
+            if self.is_running:
+                return
+            self.is_running = True
+        for index in range(self.num_workers):
+            worker = threading.Thread(target=self._worker_loop, name=f"{self.name}-{index}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, item):
+        """Queue an item, applying the overflow policy; returns False if it was dropped"""
+        with self._condition:
+            self.submitted += 1
+            if len(self._queue) >= self.max_queue:
+                if self.overflow_policy == OverflowPolicy.DROP_NEWEST:
+                    self.dropped += 1
+                    return False
+                if self.overflow_policy == OverflowPolicy.COALESCE and self.merge and self._queue:
+                    self._queue[-1] = self.merge(self._queue[-1], item)
+                    self.coalesced += 1
+                    return True
+                self._queue.popleft()
+                self.dropped += 1
+            self._queue.append(item)
+            self._condition.notify()
+            return True
+
+    def _worker_loop(self):
+        while True:
+            with self._condition:
+                while self.is_running and not self._queue:
+                    self._condition.wait()
+                if not self._queue:
+                    return  # Stopped and drained
+                item = self._queue.popleft()
+                self.in_flight += 1
+
+            try:
+                self.handler(item)
+                succeeded = True
+            except Exception as e:
+                print(f"{self.name} error: {e}")
+                succeeded = False
+
+            with self._condition:
+                self.in_flight -= 1
+                if succeeded:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+                self._condition.notify_all()
+
+    @property
+    def queued(self):
+        return len(self._queue)
+
+    def stats(self):
+        """Snapshot of the pool counters"""
+        with self._condition:
+            return {
+                "queued": len(self._queue),
+                "in_flight": self.in_flight,
+                "submitted": self.submitted,
+                "dropped": self.dropped,
+                "coalesced": self.coalesced,
+                "completed": self.completed,
+                "failed": self.failed,
+            }
+
+    def wait_idle(self, timeout=None):
+        """Block until the queue is empty and no item is being handled"""
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._queue and self.in_flight == 0, timeout)
+
+    def stop(self, drain=False):
+        """Stop the workers, optionally discarding anything still queued"""
+        with self._condition:
+            if not drain:
+                self.dropped += len(self._queue)
+                self._queue.clear()
+            self.is_running = False
+            self._condition.notify_all()
+        for worker in self._workers:
+            worker.join(timeout=1)
+        self._workers = []